@@ -0,0 +1,142 @@
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import os
+import sys
+import time
+import traceback
+
+import main as pipeline
+
+# Batch runner: solves many input sets (terms, campuses) in parallel, one process per job.
+#
+#   python batch.py manifest.json [--output-dir batch_output] [--threads-per-job 1] [--workers N]
+#
+# The manifest lists the input files of every job; paths are relative to the manifest, and an
+# input a job leaves out is main.py's file name in the manifest's directory. Options at the top
+# level apply to every job, a job's own options come after them:
+#
+#   {"options": ["--time-limit", "300"],
+#    "jobs": [{"name": "2025-fall", "courses": "fall/AcilanDersler.csv", "rooms": "fall/rooms.csv",
+#              "schedule": "fall/schedule.docx", "graduate": "fall/graduate.docx",
+#              "room_rules": "fall/room_rules.csv", "options": ["--gap", "0.01"]}]}
+#
+# Each job writes <name>.xlsx, <name>.run.json, <name>.snapshot.json and its console output
+# <name>.log into the output directory; summary.json collects one entry per job. Every job gets
+# --threads-per-job solver threads and the pool defaults to as many jobs as fit on the CPUs.
+DEFAULT_OUTPUT_DIR = 'batch_output'
+SUMMARY_JSON = 'summary.json'
+JOB_INPUTS = {  # manifest key -> (main.py option, file name used when the job leaves it out)
+    'courses': ('--courses-csv', pipeline.COURSES_CSV),
+    'rooms': ('--rooms-csv', pipeline.ROOMS_CSV),
+    'schedule': ('--schedule-docx', pipeline.SCHEDULE_DOCX),
+    'graduate': ('--graduate-docx', pipeline.GRADUATE_DOCX),
+    'room_rules': ('--room-rules', pipeline.ROOM_RULES_CSV),
+}
+
+def load_manifest(path):
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for i, job in enumerate(manifest.get('jobs', [])):
+        name = str(job.get('name') or f'job{i + 1}')
+        if any(name == other['name'] for other in jobs):
+            raise ValueError(f'duplicate job name {name!r} in {path}')
+        inputs = {key: os.path.join(base_dir, job.get(key) or default) for key, (_, default) in JOB_INPUTS.items()}
+        jobs.append({'name': name, 'inputs': inputs, 'options': list(manifest.get('options', [])) + list(job.get('options', []))})
+    if not jobs:
+        raise ValueError(f'no jobs in {path}')
+    return jobs
+
+# main.py argv for one job: its inputs, the per-job outputs, the thread budget, then its own options
+def job_argv(job, output_dir, threads):
+    stem = os.path.join(output_dir, job['name'])
+    argv = []
+    for key, (flag, _) in JOB_INPUTS.items():
+        argv += [flag, job['inputs'][key]]
+    argv += ['--output', f'{stem}.xlsx', '--run-report', f'{stem}.run.json', '--snapshot', f'{stem}.snapshot.json',
+             '--threads', str(threads)]
+    return argv + job['options']
+
+# Runs in a pool worker; a failed job is reported in the summary rather than stopping the batch
+def run_job(job, output_dir, threads):
+    argv = job_argv(job, output_dir, threads)
+    log_path = os.path.join(output_dir, f"{job['name']}.log")
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        try:
+            result = pipeline.main(argv)
+            error = None
+        except (Exception, SystemExit) as e:
+            traceback.print_exc(file=log)
+            result, error = None, f'{type(e).__name__}: {e}'
+    summary = {'name': job['name'], 'argv': argv, 'log': log_path, 'wall_time': round(time.perf_counter() - start, 3)}
+    if result is None:
+        summary.update({'status': 'Error', 'error': error})
+    else:
+        solve = result['solve']
+        summary.update({
+            'status': solve['status'],
+            'workbook': result['workbook'],
+            'run_report': result['run_report'],
+            'courses': result['courses'],
+            'assigned_courses': result['assigned_courses'],
+            'solver': solve['solver'],
+            'objective': solve['objective'],
+            'gap': solve['gap'],
+            'solve_time': solve['wall_time'],
+        })
+    return summary
+
+def print_summary(results):
+    print(f"\n{'Job':<24} {'Status':<12} {'Assigned':>12} {'Objective':>12} {'Time':>9}")
+    for r in results:
+        assigned = f"{r['assigned_courses']}/{r['courses']}" if 'courses' in r else '-'
+        objective = '-' if r.get('objective') is None else f"{r['objective']:.0f}"
+        print(f"{r['name']:<24} {r['status']:<12} {assigned:>12} {objective:>12} {r['wall_time']:>8.1f}s")
+        if r.get('error'):
+            print(f"    {r['error']} (see {r['log']})")
+
+def batch(argv=None):
+    parser = argparse.ArgumentParser(description='Solve the room assignment for many input sets in parallel.')
+    parser.add_argument('manifest', help='JSON manifest listing the jobs')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='where the per-job files go (default: %(default)s)')
+    parser.add_argument('--threads-per-job', type=int, default=1, help='solver threads given to each job (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='jobs solved at once (default: CPUs / threads per job)')
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    threads = max(1, args.threads_per_job)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // threads)
+    output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    print(f'Batch: {len(jobs)} jobs, {min(workers, len(jobs))} at a time, {threads} solver thread(s) each')
+
+    start = time.perf_counter()
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(run_job, job, output_dir, threads): job['name'] for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results[result['name']] = result
+            print(f"  {result['name']}: {result['status']} in {result['wall_time']:.1f}s", file=sys.stderr)
+    results = [results[job['name']] for job in jobs]
+
+    summary_path = os.path.join(output_dir, SUMMARY_JSON)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'manifest': os.path.abspath(args.manifest),
+            'workers': workers,
+            'threads_per_job': threads,
+            'wall_time': round(time.perf_counter() - start, 3),
+            'jobs': results,
+        }, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    print_summary(results)
+    print(f'\nSummary saved to {summary_path}')
+    return 0 if all(r['status'] != 'Error' for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(batch())
@@ -0,0 +1,205 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import pulp
+from docx import Document
+
+import main as pipeline
+
+# Benchmark harness: generates a synthetic term in the shapes the loaders expect (enrollment CSV,
+# room quota CSV, schedule and graduate DOCX tables), runs the pipeline phases on it and times
+# each one. Results are JSON so runs can be compared across commits:
+#
+#   python bench.py --sizes 400x60 2000x200 --output bench.json [main.py options]
+#
+# Sizes are SECTIONSxROOMS; the presets below span 400 sections / 60 rooms to 20,000 / 2,000.
+# Larger terms need --time-limit (or --heuristic) to keep the solve phase bounded.
+SIZE_PRESETS = {
+    'small': (400, 60),
+    'medium': (2000, 200),
+    'large': (5000, 500),
+    'campus': (20000, 2000),
+}
+DEFAULT_SIZES = ['small', 'medium']
+DEPARTMENTS = ['ARCH', 'BUS', 'CS', 'ECON', 'EE', 'ELT', 'IE', 'LAW', 'MATH', 'ME', 'PHYS', 'POLS', 'PSY', 'VA']
+DAYS = ['Mon.', 'Tue.', 'Wed.', 'Thu.', 'Fri.']
+
+def parse_size(text):
+    if text in SIZE_PRESETS:
+        return SIZE_PRESETS[text]
+    sections, _, rooms = text.lower().partition('x')
+    return int(sections), int(rooms)
+
+# Rooms: mostly mid-size classrooms with a tail of large halls and a few computer labs
+def generate_rooms(n_rooms, rng):
+    rooms = []
+    for i in range(n_rooms):
+        capacity = rng.choice([20, 25, 30, 35, 40, 45, 50, 60, 70, 80]) if i % 10 else rng.choice([100, 120, 150, 200, 250])
+        kind = 'Computer Lab' if i % 25 == 1 else 'Classroom'
+        rooms.append((f'B F{i // 40 + 1}.{i % 40 + 1} - {kind} {i}', capacity))
+    return rooms
+
+# Sections: courses with one to four sections, each meeting once or twice a week on different days
+def generate_sections(n_sections, max_capacity, rng):
+    sections = []
+    number = 100
+    while len(sections) < n_sections:
+        base = f'{rng.choice(DEPARTMENTS)}{number}'
+        number += 1
+        for _ in range(min(rng.randint(1, 4), n_sections - len(sections))):
+            enrollment = min(int(rng.lognormvariate(3.2, 0.6)) + 3, max_capacity)
+            meetings = []
+            for day in rng.sample(DAYS, rng.choice([1, 1, 2])):
+                start = rng.randint(8, 17)
+                hours = rng.choice([1, 2, 2, 3])
+                meetings.append(f'{day} {start:02d}:00-{start + hours - 1:02d}:50')
+            sections.append((base, enrollment, meetings))
+    return sections
+
+def write_schedule_docx(path, rows):
+    doc = Document()
+    table = doc.add_table(rows=1, cols=4)
+    for cell, title in zip(table.rows[0].cells, ['Course Code', 'Course Name', 'Time', 'Room']):
+        cell.text = title
+    for code, time_str in rows:
+        cells = table.add_row().cells
+        cells[0].text = code
+        cells[1].text = 'Synthetic course'
+        cells[2].text = time_str
+        cells[3].text = ''
+    doc.save(path)
+
+# Write the input files (and an empty room rules table) into workdir under the names main.py reads
+def generate_term(workdir, n_sections, n_rooms, seed):
+    rng = random.Random(seed)
+    rooms = generate_rooms(n_rooms, rng)
+    sections = generate_sections(n_sections, max(capacity for _, capacity in rooms), rng)
+    with open(os.path.join(workdir, pipeline.ROOMS_CSV), 'w', encoding='utf-8', newline='') as f:
+        f.write('"ID","Name","Teaching Capacity","Exam Capacity","Notes"\n')
+        for i, (name, capacity) in enumerate(rooms):
+            f.write(f'"{1000 + i}","{name}","{capacity}","{capacity}",""\n')
+    section_count = {}
+    schedule_rows = []
+    with open(os.path.join(workdir, pipeline.COURSES_CSV), 'w', encoding='utf-8', newline='') as f:
+        f.write(',Course Code,Course Name,T,U,L,Existing\n')
+        for base, enrollment, meetings in sections:
+            f.write(f',{base},Synthetic course,3,0,0,{enrollment}\n')
+            section_count[base] = section_count.get(base, 0) + 1
+            schedule_rows.extend((f'{base}.{section_count[base]}', t) for t in meetings)
+    write_schedule_docx(os.path.join(workdir, pipeline.SCHEDULE_DOCX), schedule_rows)
+    write_schedule_docx(os.path.join(workdir, pipeline.GRADUATE_DOCX), [])
+    # The bundled rules name real rooms; synthetic terms get an empty table
+    with open(os.path.join(workdir, pipeline.ROOM_RULES_CSV), 'w', encoding='utf-8', newline='') as f:
+        f.write('rule,course,room,fallback,label,weight\n')
+    return len(schedule_rows)
+
+def timed(phases, name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    phases[name] = round(time.perf_counter() - start, 4)
+    return result
+
+# Run the pipeline phases on the inputs in workdir; returns the per-phase timings and model sizes
+def run_phases(workdir, args):
+    phases = {}
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        inputs = timed(phases, 'load', pipeline.load_inputs, args)
+        data = timed(phases, 'normalize', pipeline.prepare_data, inputs)
+        model = timed(phases, 'model_build', pipeline.build_model, data, args)
+        if args.heuristic:
+            start = time.perf_counter()
+            heuristic = pipeline.heuristic_assign(model['costs'], data['course_table'])
+            solve_info = pipeline.use_heuristic_solution(model, heuristic, time.perf_counter() - start)
+            phases['solve'] = round(solve_info['wall_time'], 4)
+        else:
+            solve_info = timed(phases, 'solve', pipeline.solve_assignment, model, args)
+        if args.heuristic or pipeline.has_solution(solve_info):
+            assignment = timed(phases, 'extract', pipeline.extract_assignment, model['x'], model['fixed_assignment'],
+                               model['room_classes'])
+        else:
+            assignment = dict(model['fixed_assignment'])
+        course_id = data['course_table']['id']
+        enrollments = data['course_table']['enrollment']
+        capacities = data['capacities']
+        rows = [[c, r, t, '', '', enrollments[course_id[c]], capacities[r], '', 'Assigned']
+                for (c, t), r in sorted(assignment.items())]
+        timed(phases, 'excel_write', pipeline.write_assignments_workbook, pipeline.ASSIGNMENTS_XLSX, rows, solve_info)
+    finally:
+        os.chdir(cwd)
+    return {
+        'phases': phases,
+        'variables': len(model['x']),
+        'constraints': pipeline.model_constraints(model),
+        'course_times': len(model['candidates']),
+        'assigned': len(assignment),
+        'solver': solve_info['solver'],
+        'status': solve_info['status'],
+        'objective': solve_info['objective'],
+    }
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+def bench(argv=None):
+    parser = argparse.ArgumentParser(description='Time the assignment pipeline on synthetic terms.')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help=f'SECTIONSxROOMS or a preset ({", ".join(SIZE_PRESETS)}); default: %(default)s')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per size (inputs are generated once)')
+    parser.add_argument('--output', default=None, help='write the JSON results here instead of stdout')
+    parser.add_argument('--keep-inputs', default=None, metavar='DIR', help='generate the terms under DIR and keep them')
+    bench_args, rest = parser.parse_known_args(argv)
+    args = pipeline.parse_args(['--no-input-cache'] + rest)
+
+    results = []
+    for size in bench_args.sizes:
+        n_sections, n_rooms = parse_size(size)
+        if bench_args.keep_inputs:
+            workdir = os.path.join(bench_args.keep_inputs, f'{n_sections}x{n_rooms}-{bench_args.seed}')
+            os.makedirs(workdir, exist_ok=True)
+            term_dir = contextlib.nullcontext(workdir)
+        else:
+            term_dir = tempfile.TemporaryDirectory(prefix='bench-')
+        with term_dir as workdir:
+            start = time.perf_counter()
+            meetings = generate_term(workdir, n_sections, n_rooms, bench_args.seed)
+            generate_time = round(time.perf_counter() - start, 4)
+            for run in range(bench_args.repeat):
+                result = run_phases(workdir, args)
+                result.update({'sections': n_sections, 'rooms': n_rooms, 'meetings': meetings,
+                               'seed': bench_args.seed, 'run': run, 'generate': generate_time})
+                results.append(result)
+                print(f"{n_sections}x{n_rooms} run {run}: " + ', '.join(f'{k} {v:.3f}s' for k, v in result['phases'].items()),
+                      file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pulp': pulp.__version__ if hasattr(pulp, '__version__') else None,
+        'options': rest,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if bench_args.output:
+        with open(bench_args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    bench()
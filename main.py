@@ -1,10 +1,48 @@
+import argparse
+import array
+import bisect
+import codecs
+import concurrent.futures
+import cProfile
 import csv
+import functools
+import hashlib
+import io
+import json
+import math
 from docx import Document
 import pulp
 import os
 import openpyxl
 import re
-from collections import defaultdict
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict, namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # metrics fall back to plain Python
+    np = None
+try:
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import csr_array
+except ImportError:  # the matrix back end tries highspy next, then falls back to PuLP
+    milp = None
+try:
+    import highspy
+except ImportError:
+    highspy = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # inputs are cached as JSON and Parquet paths are refused
+    pq = None
+try:
+    import resource
+except ImportError:  # not on Windows; the run report leaves peak RSS empty
+    resource = None
 
 # File paths
 COURSES_CSV = 'AcilanDersler.csv'
@@ -12,65 +50,127 @@ ROOMS_CSV = 'Class Quotas  E-Campus.csv'
 SCHEDULE_DOCX = '2025spring_schedule_march_28_1515.docx'
 GRADUATE_DOCX = 'graduate.docx'
 
+# Shared CSV reader: the file is read once, the encoding is picked from the buffer (BOM, then
+# the first of CSV_ENCODINGS that decodes all of it) and rows stream from the decoded text.
+# latin1 maps every byte, so the last candidate always succeeds.
+CSV_ENCODINGS = ['utf-8', 'cp1254', 'latin1']
+
+def decode_csv_bytes(data):
+    if data.startswith(codecs.BOM_UTF8):
+        return data.decode('utf-8-sig'), 'utf-8-sig'
+    for enc in CSV_ENCODINGS[:-1]:
+        try:
+            return data.decode(enc), enc
+        except UnicodeDecodeError:
+            continue
+    return data.decode(CSV_ENCODINGS[-1]), CSV_ENCODINGS[-1]
+
+def open_csv_text(csv_path):
+    with open(csv_path, 'rb') as f:
+        text, _ = decode_csv_bytes(f.read())
+    return io.StringIO(text, newline='')
+
+# Parquet tables: the normalized inputs (one row per section, room or meeting) and the assignment
+# rows, stored by column. Any loader takes a .parquet path in place of its CSV or DOCX file, and
+# --parquet-dir writes the tables of a run so the next one (or an analytics job) skips the
+# parsers and openpyxl. Needs pyarrow.
+ENROLLMENT_COLUMNS = ['course_code', 'enrollment']
+ROOM_COLUMNS = ['room', 'capacity']
+SCHEDULE_COLUMNS = ['course_code', 'time', 'room']
+
+def is_parquet(path):
+    return path.lower().endswith('.parquet')
+
+def read_parquet_rows(path, columns):
+    if pq is None:
+        raise ValueError(f'{path}: reading Parquet needs pyarrow (pip install pyarrow)')
+    table = pq.read_table(path, columns=columns)
+    return list(zip(*(table.column(name).to_pylist() for name in columns)))
+
+# Write then rename, so a reader never sees a half-written file; metadata values are strings
+def write_parquet_rows(path, columns, rows, metadata=None):
+    table = pa.table({name: [row[i] for row in rows] for i, name in enumerate(columns)})
+    if metadata:
+        table = table.replace_schema_metadata(metadata)
+    fd, tmp_path = tempfile.mkstemp(suffix='.parquet', dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
 # 1. Parse course enrollments
 def load_course_enrollments(csv_path):
+    if is_parquet(csv_path):
+        return dict(read_parquet_rows(csv_path, ENROLLMENT_COLUMNS))
     enrollments = {}
     code_counts = defaultdict(int)
-    encodings = ['utf-8-sig', 'cp1254', 'latin1']
-    for enc in encodings:
-        try:
-            with open(csv_path, encoding=enc) as f:
-                reader = csv.reader(f)
-                header = next(reader)
-                # Find indices
-                code_idx = None
-                exist_idx = None
-                for i, col in enumerate(header):
-                    if 'Course Code' in col:
-                        code_idx = i
-                    if 'Existing' in col:
-                        exist_idx = i
-                if code_idx is None or exist_idx is None:
-                    continue
-                for row in reader:
-                    if len(row) > max(code_idx, exist_idx):
-                        base_code = row[code_idx]
-                        try:
-                            n = int(row[exist_idx])
-                        except (ValueError, IndexError):
-                            continue
-                        if base_code:
-                            code_counts[base_code] += 1
-                            sectioned_code = f"{base_code}.{code_counts[base_code]}"
-                            enrollments[sectioned_code] = n
-            break
-        except UnicodeDecodeError:
-            continue
+    reader = csv.reader(open_csv_text(csv_path))
+    header = next(reader, [])
+    # Find indices
+    code_idx = None
+    exist_idx = None
+    for i, col in enumerate(header):
+        if 'Course Code' in col:
+            code_idx = i
+        if 'Existing' in col:
+            exist_idx = i
+    if code_idx is None or exist_idx is None:
+        return enrollments
+    for row in reader:
+        if len(row) > max(code_idx, exist_idx):
+            base_code = row[code_idx]
+            try:
+                n = int(row[exist_idx])
+            except (ValueError, IndexError):
+                continue
+            if base_code:
+                code_counts[base_code] += 1
+                sectioned_code = f"{base_code}.{code_counts[base_code]}"
+                enrollments[sectioned_code] = n
     return enrollments
 
+# Course table, built once after the section merges: course_id[code] -> dense id, course_code[id]
+# and enrollment[id] in a flat array. A sectioned code listed only by its base (POLS304.1 ->
+# POLS304) gets the base's enrollment here, so lookups never split codes again. Codes without
+# an enrollment get no id.
+def build_course_table(enrollments_raw, codes):
+    course_id = {}
+    course_code = []
+    enrollment = array.array('l')
+    for code in list(enrollments_raw) + list(codes):
+        if code in course_id:
+            continue
+        if code in enrollments_raw:
+            n = enrollments_raw[code]
+        else:
+            base = code.split('.')[0]
+            if base not in enrollments_raw:
+                continue
+            n = enrollments_raw[base]
+        course_id[code] = len(course_code)
+        course_code.append(code)
+        enrollment.append(n)
+    return {'id': course_id, 'code': course_code, 'enrollment': enrollment}
+
 # 2. Parse room capacities
 def load_room_capacities(csv_path):
+    if is_parquet(csv_path):
+        return dict(read_parquet_rows(csv_path, ROOM_COLUMNS))
     capacities = {}
-    encodings = ['utf-8-sig', 'cp1254', 'latin1']
-    for enc in encodings:
-        try:
-            with open(csv_path, encoding=enc) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    name = row.get('Name')
-                    cap = row.get('Teaching Capacity')
-                    if name and cap:
-                        try:
-                            capacities[name] = int(cap)
-                        except ValueError:
-                            continue
-            break
-        except UnicodeDecodeError:
-            continue
+    reader = csv.DictReader(open_csv_text(csv_path))
+    for row in reader:
+        name = row.get('Name')
+        cap = row.get('Teaching Capacity')
+        if name and cap:
+            try:
+                capacities[name] = int(cap)
+            except ValueError:
+                continue
     return capacities
 
 # 3. Parse course schedule from DOCX
 def load_course_schedule(docx_path):
+    if is_parquet(docx_path):
+        return [dict(zip(SCHEDULE_COLUMNS, row)) for row in read_parquet_rows(docx_path, SCHEDULE_COLUMNS)]
     schedule = []
     doc = Document(docx_path)
     for table in doc.tables:
@@ -89,10 +189,1104 @@ def load_course_schedule(docx_path):
                     schedule.append({'course_code': course_code, 'time': time, 'room': room})
     return schedule
 
-def main():
-    # Load data
-    enrollments_raw = load_course_enrollments(COURSES_CSV)
-    capacities = load_room_capacities(ROOMS_CSV)
+# Unless cache_dir is None, parsed inputs are memoized on (path, mtime, size) for the life of
+# the process and kept as normalized tables (Parquet with pyarrow, JSON without) so later runs
+# skip the CSV and DOCX parsers entirely. With None every call parses the file again. Loaders
+# return lists of row tuples here.
+INPUT_CACHE_DIR = '.input_cache'
+_input_memo = {}
+
+def load_cached(path, loader, columns, cache_dir=INPUT_CACHE_DIR):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, tuple(columns))
+    rows = _input_memo.get(key) if cache_dir else None
+    if rows is None:
+        cache_file = None
+        if cache_dir and not is_parquet(path):
+            digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+            cache_file = os.path.join(cache_dir, digest + ('.parquet' if pq is not None else '.json'))
+        if cache_file and os.path.exists(cache_file):
+            if pq is not None:
+                rows = read_parquet_rows(cache_file, columns)
+            else:
+                with open(cache_file, encoding='utf-8') as f:
+                    rows = [tuple(row) for row in json.load(f)]
+        else:
+            rows = loader(path)
+            if cache_file:
+                os.makedirs(cache_dir, exist_ok=True)
+                if pq is not None:
+                    write_parquet_rows(cache_file, columns, rows)
+                else:
+                    # Write then rename, so parallel runs never read a half-written cache file
+                    fd, tmp_path = tempfile.mkstemp(suffix='.json', dir=cache_dir)
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(rows, f, ensure_ascii=False)
+                    os.replace(tmp_path, cache_file)
+        if cache_dir:
+            _input_memo[key] = rows
+    return rows
+
+def load_course_enrollments_cached(csv_path, cache_dir=INPUT_CACHE_DIR):
+    return dict(load_cached(csv_path, lambda path: list(load_course_enrollments(path).items()),
+                            ENROLLMENT_COLUMNS, cache_dir))
+
+def load_room_capacities_cached(csv_path, cache_dir=INPUT_CACHE_DIR):
+    return dict(load_cached(csv_path, lambda path: list(load_room_capacities(path).items()), ROOM_COLUMNS, cache_dir))
+
+def load_course_schedule_cached(docx_path, cache_dir=INPUT_CACHE_DIR):
+    rows = load_cached(docx_path, lambda path: [tuple(s[k] for k in SCHEDULE_COLUMNS) for s in load_course_schedule(path)],
+                       SCHEDULE_COLUMNS, cache_dir)
+    # Callers rewrite course codes in place, so every call gets fresh dicts
+    return [dict(zip(SCHEDULE_COLUMNS, row)) for row in rows]
+
+# 4. Parse meeting times (e.g., 'Wed. 12:00-13:50', 'Mon 12:00 – 14:50')
+TimeSlot = namedtuple('TimeSlot', ['day', 'start', 'end'])  # start/end in minutes from midnight
+TIME_RANGE_RE = re.compile(r'(\d{1,2}):(\d{2})\s*[-\u2013]\s*(\d{1,2}):(\d{2})')
+DAY_RE = re.compile(r'^\s*([A-Za-z]+)')
+
+@functools.lru_cache(maxsize=None)
+def parse_time_slot(time_str):
+    match = TIME_RANGE_RE.search(time_str)
+    if not match:
+        return None
+    h1, m1, h2, m2 = map(int, match.groups())
+    if h2 * 60 + m2 <= h1 * 60 + m1:
+        return None  # empty or inverted range (a typo); treated like an unparsed time
+    day = DAY_RE.match(time_str)
+    return TimeSlot(day.group(1)[:3].title() if day else '', h1 * 60 + m1, h2 * 60 + m2)
+
+def times_overlap(t1, t2):
+    if t1 == t2:
+        return True
+    s1 = parse_time_slot(t1)
+    s2 = parse_time_slot(t2)
+    if s1 is None or s2 is None:
+        return False
+    return s1.day == s2.day and s1.start < s2.end and s2.start < s1.end
+
+# Sweep over (start, end, key) intervals; returns the maximal sets of keys that overlap
+def overlap_cliques(slots):
+    events = []
+    for start, end, key in slots:
+        events.append((start, 1, key))
+        events.append((end, 0, key))
+    events.sort()  # at the same minute, intervals end before new ones start
+    cliques = []
+    active = set()
+    grew = False
+    for _, is_start, key in events:
+        if is_start:
+            active.add(key)
+            grew = True
+        else:
+            if grew:
+                cliques.append(sorted(active))
+                grew = False
+            active.discard(key)
+    return cliques
+
+# Helper: parse duration in hours from time string (e.g., 'Wed. 12:00-14:50')
+def parse_duration(time_str):
+    slot = parse_time_slot(time_str)
+    if slot is None:
+        return 1  # fallback if parsing fails
+    duration_min = slot.end - slot.start
+    if duration_min <= 60:
+        return 1
+    elif duration_min > 60 and duration_min <= 120:
+        return 2
+    elif duration_min > 120 and duration_min <= 180:
+        return 3
+    elif duration_min > 180 and duration_min <= 240:
+        return 4
+    elif duration_min > 240 and duration_min <= 300:
+        return 5
+    elif duration_min > 300 and duration_min <= 360:
+        return 6
+    elif duration_min > 360 and duration_min <= 420:
+        return 7
+    else:
+        return 7  # cap at 7 hours
+
+# 5. Build the sparse assignment variables
+# The model works on dense integer ids. Rooms are interned in capacity order and meeting times
+# by first use, with capacity, weekday, start, end and duration held in flat arrays indexed by
+# id, and each schedulable course-time becomes a CourseTime record. The variable builder then
+# compares ints instead of hashing the long room and time strings, and variables get short
+# names (x0, x1, ...) instead of PuLP's name-mangled tuples.
+class CourseTime:
+    __slots__ = ('course', 'time', 'course_id', 'time_id')
+
+    def __init__(self, course, time, course_id, time_id):
+        self.course = course
+        self.time = time
+        self.course_id = course_id
+        self.time_id = time_id
+
+def build_model_index(courses, course_times, capacities, course_table, extra_times=()):
+    room_name = sorted(capacities, key=lambda r: (capacities[r], r))
+    index = {
+        'room_id': {r: i for i, r in enumerate(room_name)},
+        'room_name': room_name,
+        'capacity': array.array('l', (capacities[r] for r in room_name)),
+        'time_id': {},
+        'time_str': [],
+        'day': array.array('l'),  # weekday id; an unparsed time gets its own negative day
+        'start': array.array('l'),
+        'end': array.array('l'),
+        'duration': array.array('l'),
+        'course_times': [],
+    }
+    day_id = {}
+
+    def intern_time(t):
+        if t not in index['time_id']:
+            tid = len(index['time_str'])
+            slot = parse_time_slot(t)
+            index['time_id'][t] = tid
+            index['time_str'].append(t)
+            index['day'].append(day_id.setdefault(slot.day, len(day_id)) if slot else -1 - tid)
+            index['start'].append(slot.start if slot else 0)
+            index['end'].append(slot.end if slot else 1)
+            index['duration'].append(parse_duration(t))
+        return index['time_id'][t]
+
+    course_id = course_table['id']
+    for c in courses:
+        for t in dict.fromkeys(course_times[c]):
+            index['course_times'].append(CourseTime(c, t, course_id[c], intern_time(t)))
+    for t in extra_times:
+        intern_time(t)
+    return index
+
+def time_ids_overlap(index, t1, t2):
+    return t1 == t2 or (index['day'][t1] == index['day'][t2]
+                        and index['start'][t1] < index['end'][t2] and index['start'][t2] < index['end'][t1])
+
+# Pinned course-times are not part of the model at all: their room is known, and every other
+# course is kept out of that room at overlapping times by never creating those variables.
+# A (course, room, time) triple is only created when the room is big enough, not excluded for
+# the course and not held by another course's pin. Returns x keyed by (course, room, time) and
+# the (CourseTime, room id) column behind each variable, in the same order.
+def build_assignment_variables(index, course_table, pinned, excluded, room_owners):
+    room_id = index['room_id']
+    room_name = index['room_name']
+    capacity = index['capacity']
+    time_id = index['time_id']
+    room_pin_times = defaultdict(list)
+    for (r, t), owners in room_owners.items():
+        if r in room_id:
+            room_pin_times[room_id[r]].append((time_id[t], owners))
+    enrollments = course_table['enrollment']
+    columns = []
+    for ct in index['course_times']:
+        if (ct.course, ct.time) in pinned:
+            continue
+        skip = excluded.get((ct.course, ct.time), ())
+        # Rooms are in capacity order, so the first room that fits starts the candidates
+        for rid in range(bisect.bisect_left(capacity, enrollments[ct.course_id]), len(room_name)):
+            if room_name[rid] in skip:
+                continue
+            if any(ct.course not in owners and time_ids_overlap(index, ct.time_id, tid)
+                   for tid, owners in room_pin_times.get(rid, ())):
+                continue
+            columns.append((ct, rid))
+    x = {}
+    for i, (ct, rid) in enumerate(columns):
+        x[ct.course, room_name[rid], ct.time] = pulp.LpVariable(f'x{i}', cat='Binary')
+    return x, columns
+
+# Rooms whose pins overlap in time for different courses (the rules ask for the impossible)
+def find_pin_conflicts(room_owners):
+    room_pin_times = defaultdict(list)
+    for (r, t), owners in room_owners.items():
+        room_pin_times[r].append((t, owners))
+    conflicts = []
+    for r, pins in room_pin_times.items():
+        for i, (t1, owners1) in enumerate(pins):
+            for t2, owners2 in pins[i + 1:]:
+                if owners1 != owners2 and times_overlap(t1, t2):
+                    conflicts.append((r, t1, sorted(owners1), t2, sorted(owners2)))
+    return conflicts
+
+# 6. Room conflict constraints
+# Columns are grouped by room and day id, and a sweep over the meeting intervals emits one
+# row per maximal group of overlapping times (a clique of the interval graph), so
+# 'Wed. 12:00-13:50' and 'Wed. 13:00-14:50' can no longer share a room. Rows are lists of
+# column indices; build_model turns them into PuLP constraints or a CSR matrix.
+def room_conflict_rows(columns, index):
+    room_time_cols = defaultdict(list)
+    for j, (ct, rid) in enumerate(columns):
+        room_time_cols[(rid, ct.time_id)].append(j)
+    room_day_slots = defaultdict(list)
+    for (rid, tid) in room_time_cols:
+        # Unparsed times have a day of their own, so they only conflict with the identical string
+        room_day_slots[(rid, index['day'][tid])].append((index['start'][tid], index['end'][tid], tid))
+    rows = []
+    for (rid, _), slots in room_day_slots.items():
+        for clique in overlap_cliques(slots):
+            cols = [j for tid in clique for j in room_time_cols[(rid, tid)]]
+            if len(cols) > 1:
+                rows.append(cols)
+    return rows
+
+# Room classes
+# With --room-classes, generic rooms of equal capacity are merged into one class: the model only
+# decides which class each course-time goes to, a conflict row allows as many overlapping
+# course-times as the class has rooms, and the rooms inside a class are handed out afterwards.
+# Rooms differ for the model only in capacity and in the exclusions that list them, so a class is
+# the rooms that share both; a room named by a pin, a preference or a status label stays a class
+# of its own. Meetings in a class form an interval graph, so first-fit in start order places every
+# course-time whenever no conflict row is over the class size.
+def group_room_classes(capacities, excluded, named_rooms):
+    exclusion_sets = list(set(frozenset(rooms) for rooms in excluded.values()))
+    groups = defaultdict(list)
+    for r in sorted(capacities):
+        if r in named_rooms:
+            groups[r].append(r)
+        else:
+            signature = frozenset(i for i, rooms in enumerate(exclusion_sets) if r in rooms)
+            groups[(capacities[r], signature)].append(r)
+    room_classes = {}
+    for rooms in groups.values():
+        name = rooms[0] if len(rooms) == 1 else f'{capacities[rooms[0]]}-seat class of {len(rooms)} ({rooms[0]}, ...)'
+        room_classes[name] = rooms
+    return room_classes
+
+# Hand out the rooms of each class to the course-times the model put in it; returns a new assignment
+def assign_class_rooms(assignment, room_classes):
+    meetings = defaultdict(list)  # (class, day) -> [(start, end, course, time)]
+    for (c, t), name in assignment.items():
+        if len(room_classes.get(name, ())) > 1:
+            slot = parse_time_slot(t)
+            if slot is None:
+                meetings[(name, t)].append((0, 1, c, t))
+            else:
+                meetings[(name, slot.day)].append((slot.start, slot.end, c, t))
+    assignment = dict(assignment)
+    for (name, _), day_meetings in meetings.items():
+        rooms = room_classes[name]
+        free_at = dict.fromkeys(rooms, 0)  # room -> end of its last meeting that day
+        for start, end, c, t in sorted(day_meetings):
+            # The class limit on every conflict row guarantees a free room
+            room = next(r for r in rooms if free_at[r] <= start)
+            free_at[room] = end
+            assignment[(c, t)] = room
+    return assignment
+
+# 7. Room rules
+# room_rules.csv holds one rule per row (rule, course, room, fallback, label):
+#   must_use             the course uses the room, regardless of capacity
+#   prefer               the course uses the room if it fits and no pin holds it at an overlapping
+#                        time, otherwise any fitting room (or any room in the `fallback` group)
+#   co_locate            the courses listed for a room share it at the times two or more of them meet
+#   exclude_specialized  the room is kept from every course that has no rule of its own
+# `label` names the room in the Assignment Status column. With soft preferences, prefer rules do
+# not pin: the preferred room earns `weight` (default DEFAULT_PREFERENCE_WEIGHT) seat-hours per
+# meeting hour off the objective, and the solver trades preferences off in one solve.
+ROOM_RULES_CSV = 'room_rules.csv'
+RULE_TYPES = ('must_use', 'prefer', 'co_locate', 'exclude_specialized')
+DEFAULT_PREFERENCE_WEIGHT = 50
+
+def load_room_rules(csv_path):
+    rules = []
+    reader = csv.DictReader(open_csv_text(csv_path))
+    for line_no, row in enumerate(reader, start=2):
+        rule = {k: (row.get(k) or '').strip() for k in ('rule', 'course', 'room', 'fallback', 'label', 'weight')}
+        if rule['rule'] not in RULE_TYPES:
+            raise ValueError(f"{csv_path}:{line_no}: unknown rule type {rule['rule']!r}")
+        try:
+            rule['weight'] = float(rule['weight']) if rule['weight'] else None
+        except ValueError:
+            raise ValueError(f"{csv_path}:{line_no}: weight must be a number, got {rule['weight']!r}")
+        rules.append(rule)
+    return rules
+
+# Compile the rules into the pins and exclusions the variable builder uses, walking the scheduled
+# courses once. Returns (pinned, excluded, room_owners, status_rules, preferences):
+#   pinned[(c, t)] = the room course c must use at time t
+#   excluded[(c, t)] = rooms course c may not use at time t
+#   room_owners[(r, t)] = courses allowed in room r at time t (every other course is blocked)
+#   status_rules[c] = (label, rooms that earn the label)
+#   preferences[(c, t)] = (room, weight), only filled with soft_preferences
+def compile_room_rules(rules, courses, course_times, capacities, course_table, room_groups, preassigned,
+                       soft_preferences=False, preference_weight=DEFAULT_PREFERENCE_WEIGHT):
+    pinned = {}
+    preferences = {}
+    excluded = {}
+    room_owners = defaultdict(set)
+    room_pin_times = defaultdict(list)
+    status_rules = {}
+    unknown_rooms = defaultdict(set)  # room named by a rule or preassignment -> courses left unpinned
+
+    def pin(course, room, t, owners=None):
+        # A room missing from the quota list (e.g. renamed) cannot hold anything; the course-time
+        # keeps its ordinary candidate rooms instead of dropping out of the model
+        if room not in capacities:
+            unknown_rooms[room].add(course)
+            return
+        pinned[(course, t)] = room
+        owners = owners or [course]
+        if (room, t) not in room_owners:
+            room_pin_times[room].append(t)
+        room_owners[(room, t)].update(owners)
+
+    def room_held(course, room, t):
+        return any(course not in room_owners[(room, t2)] and times_overlap(t, t2) for t2 in room_pin_times[room])
+
+    specialized = set()
+    course_rules = defaultdict(list)
+    co_locate_groups = defaultdict(list)
+    for index, rule in enumerate(rules):
+        if rule['rule'] == 'exclude_specialized':
+            specialized.add(rule['room'])
+            continue
+        course_rules[rule['course']].append((index, rule))
+        if rule['rule'] == 'co_locate':
+            co_locate_groups[rule['room']].append(rule['course'])
+    specialized = frozenset(specialized)
+
+    # Preassigned special lab courses keep their lab at that time
+    for p in preassigned:
+        if p['room']:
+            pin(p['course_code'], p['room'], p['time'])
+
+    # Hard pins first; prefer rules are resolved after them, in table order
+    course_set = set(courses)
+    deferred = []
+    for c, times in course_times.items():
+        if c not in course_rules:
+            if c in course_set:
+                for t in times:
+                    excluded[(c, t)] = specialized
+            continue
+        for index, rule in course_rules[c]:
+            room = rule['room']
+            label_rooms = set([room])
+            if rule['fallback']:
+                label_rooms.update(room_groups.get(rule['fallback'], ()))
+            status_rules[c] = (rule['label'] or room, label_rooms)
+            if rule['rule'] == 'must_use':
+                for t in times:
+                    pin(c, room, t)
+            elif rule['rule'] == 'co_locate':
+                group = co_locate_groups[room]
+                for t in times:
+                    if sum(1 for c2 in group if t in course_times.get(c2, ())) > 1:
+                        pin(c, room, t, owners=group)
+            else:
+                deferred.append((index, c, rule))
+    for index, c, rule in sorted(deferred, key=lambda item: item[0]):
+        room = rule['room']
+        enrollment = course_table['enrollment'][course_table['id'][c]] if c in course_table['id'] else None
+        for t in dict.fromkeys(course_times[c]):
+            if (c, t) in pinned:
+                continue
+            if soft_preferences:
+                preferences[(c, t)] = (room, preference_weight if rule['weight'] is None else rule['weight'])
+            else:
+                fits = room in capacities and enrollment is not None and capacities[room] >= enrollment
+                if fits and not room_held(c, room, t):
+                    pin(c, room, t)
+                    continue
+            if rule['fallback']:
+                group = set(room_groups.get(rule['fallback'], ()))
+                excluded[(c, t)] = set(r for r in capacities if r not in group)
+    for room, pinned_courses in unknown_rooms.items():
+        print(f'Warning: room {room} is not in the room list; {sorted(pinned_courses)} keep their usual candidate rooms')
+    return pinned, excluded, room_owners, status_rules, preferences
+
+# 8. Solver settings
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Assign scheduled courses to classrooms.')
+    parser.add_argument('--solver', choices=['cbc', 'highs'], default='cbc',
+                        help='MILP backend; highs needs the highspy package and falls back to cbc without it')
+    parser.add_argument('--backend', choices=['pulp', 'matrix'], default='pulp',
+                        help='matrix: pass CSR arrays to scipy.optimize.milp or highspy instead of building PuLP expressions')
+    parser.add_argument('--time-limit', type=float, default=None, help='stop the solver after this many seconds')
+    parser.add_argument('--gap', type=float, default=None, help='relative MIP gap to stop at (e.g. 0.01 for 1%%)')
+    parser.add_argument('--threads', type=int, default=None, help='number of solver threads')
+    parser.add_argument('--warm-start', action='store_true', help='pass initial variable values to CBC as a MIP start')
+    parser.add_argument('--solver-log', default=None, help='keep the solver log at this path')
+    parser.add_argument('--warm-start-from', default=None, metavar='XLSX',
+                        help='use the assignments in a previous course_assignments.xlsx (or assignments.parquet) as the MIP start')
+    parser.add_argument('--heuristic', action='store_true',
+                        help='skip the MILP and use the greedy best-fit assignment with local search')
+    parser.add_argument('--heuristic-start', action='store_true',
+                        help='pass the greedy assignment to CBC as a MIP start')
+    parser.add_argument('--decompose', action='store_true',
+                        help='solve one independent sub-problem per weekday in a process pool')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size for --decompose (default: CPU count)')
+    parser.add_argument('--room-classes', action='store_true',
+                        help='model equal-capacity generic rooms as one class and pick the rooms after the solve')
+    parser.add_argument('--lazy-conflicts', action='store_true',
+                        help='start without the room conflict rows and add the violated ones between re-solves')
+    parser.add_argument('--courses-csv', default=COURSES_CSV, help='course enrollments (default: %(default)s)')
+    parser.add_argument('--rooms-csv', default=ROOMS_CSV, help='room capacities (default: %(default)s)')
+    parser.add_argument('--schedule-docx', default=SCHEDULE_DOCX, help='term schedule (default: %(default)s)')
+    parser.add_argument('--graduate-docx', default=GRADUATE_DOCX, help='graduate schedule (default: %(default)s)')
+    parser.add_argument('--output', default=ASSIGNMENTS_XLSX, help='workbook to write (default: %(default)s)')
+    parser.add_argument('--snapshot', default=SNAPSHOT_JSON, help='snapshot used by --incremental (default: %(default)s)')
+    parser.add_argument('--room-rules', default=ROOM_RULES_CSV, help='room rules table (default: %(default)s)')
+    parser.add_argument('--soft-preferences', action='store_true',
+                        help='treat prefer rules as objective bonuses instead of pinning before the solve')
+    parser.add_argument('--preference-weight', type=float, default=DEFAULT_PREFERENCE_WEIGHT,
+                        help='seat-hours per meeting hour a preferred room is worth (rules may set their own weight)')
+    parser.add_argument('--no-input-cache', '--no-schedule-cache', dest='no_input_cache', action='store_true',
+                        help=f'always re-parse the CSV and DOCX inputs instead of using {INPUT_CACHE_DIR}/')
+    parser.add_argument('--parquet-dir', default=None, metavar='DIR',
+                        help='also write the normalized inputs and the assignments as Parquet tables (needs pyarrow)')
+    parser.add_argument('--run-report', default=RUN_REPORT_JSON, help='per-phase timing report (default: %(default)s)')
+    parser.add_argument('--profile-phases', action='store_true', help='write a cProfile dump per phase')
+    parser.add_argument('--trace-memory', action='store_true', help='record the peak traced Python allocation per phase')
+    parser.add_argument('--incremental', action='store_true',
+                        help='keep the previous run\'s rooms for course-times the input changes do not touch')
+    return parser.parse_args(argv)
+
+# Read (course, time) -> room from a workbook written by main(), or from its Parquet assignments table
+def load_warm_start(xlsx_path):
+    previous = {}
+    wb = None
+    if is_parquet(xlsx_path):
+        rows = read_parquet_rows(xlsx_path, ASSIGNMENT_COLUMNS[:5])
+    else:
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        ws = wb['Assignments'] if 'Assignments' in wb.sheetnames else wb.active
+        rows = ws.iter_rows(min_row=2, values_only=True)
+    for row in rows:
+        if len(row) < 5 or not row[0]:
+            continue
+        code, room1, time1, room2, time2 = row[:5]
+        if room1 and time1:
+            previous[(code, time1)] = room1
+        if room2 and time2:
+            previous[(code, time2)] = room2
+    if wb is not None:
+        wb.close()
+    return previous
+
+# Set initial values on x from a previous assignment; returns the number of course-times matched
+def apply_warm_start(x, previous):
+    matched = set()
+    for (c, r, t), var in x.items():
+        room = previous.get((c, t))
+        if room is None or (c, room, t) not in x:
+            continue
+        var.setInitialValue(1 if r == room else 0)
+        matched.add((c, t))
+    return len(matched)
+
+def make_solver(args, log_path=None):
+    if args.solver == 'highs':
+        highs = pulp.HiGHS(msg=False, timeLimit=args.time_limit, gapRel=args.gap, threads=args.threads)
+        if highs.available():
+            return highs
+        print('HiGHS is not available (pip install highspy); falling back to CBC')
+    return pulp.PULP_CBC_CMD(msg=False, timeLimit=args.time_limit, gapRel=args.gap, threads=args.threads,
+                             warmStart=args.warm_start or bool(args.warm_start_from) or args.heuristic_start, logPath=log_path)
+
+# CBC only reports the gap in its log ('Gap: 0.0123') when it stops before proving optimality
+def read_cbc_gap(log_path, status):
+    gap = None
+    if log_path and os.path.exists(log_path):
+        with open(log_path, errors='replace') as f:
+            for line in f:
+                match = re.match(r'\s*Gap:\s*(\S+)', line)
+                if match:
+                    try:
+                        gap = float(match.group(1))
+                    except ValueError:
+                        pass
+    if gap is None and status == pulp.LpStatusOptimal:
+        gap = 0.0
+    return gap
+
+# HiGHS reports an infinite gap when it has no incumbent; the run report and batch summary are
+# JSON, which has no Infinity, so that is an unknown gap
+def finite_gap(gap):
+    return gap if gap is not None and math.isfinite(gap) else None
+
+def solve_model(prob, args):
+    log_path = args.solver_log
+    if log_path is None:
+        fd, log_path = tempfile.mkstemp(suffix='.log', prefix='cbc-')
+        os.close(fd)
+    solver = make_solver(args, log_path)
+    start = time.perf_counter()
+    try:
+        prob.solve(solver)
+        wall_time = time.perf_counter() - start
+        if isinstance(solver, pulp.HiGHS):
+            gap = finite_gap(prob.solverModel.getInfo().mip_gap)
+        else:
+            gap = read_cbc_gap(log_path, prob.status)
+    finally:
+        if args.solver_log is None:
+            os.remove(log_path)
+    return {
+        'solver': solver.name,
+        'status': pulp.LpStatus[prob.status],
+        'solution': pulp.LpSolution[prob.sol_status],
+        'gap': gap,
+        'wall_time': wall_time,
+        'objective': pulp.value(prob.objective),
+    }
+
+# A solver stopped by --time-limit before its first incumbent leaves variable values that are not
+# a solution; only optimal and integer-feasible results are read back
+def has_solution(solve_info):
+    return solve_info['solution'] in (pulp.LpSolution[pulp.LpSolutionOptimal],
+                                      pulp.LpSolution[pulp.LpSolutionIntegerFeasible])
+
+def format_solve_info(solve_info):
+    gap = 'n/a' if solve_info['gap'] is None else f"{solve_info['gap']:.4%}"
+    return (f"Solver: {solve_info['solver']}, status: {solve_info['status']} ({solve_info['solution']}), "
+            f"gap: {gap}, wall time: {solve_info['wall_time']:.2f}s")
+
+# Constraints in insertion order across PuLP versions (dict attribute before 3.x, list method in 4.0)
+def problem_constraints(prob):
+    constraints = prob.constraints
+    return list(constraints() if callable(constraints) else constraints.values())
+
+# 9. Decomposed solve
+# Room conflicts only link course-times on the same day, so the model falls apart into
+# independent pieces. Variables are grouped into connected components through shared
+# constraints, the components are bucketed by weekday, and each bucket is solved as its own
+# MILP in a process pool. The values are merged back into x.
+def split_by_day(prob, x):
+    parent = {}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    var_day = {}
+    for (c, r, t), var in x.items():
+        parent[var.name] = var.name
+        slot = parse_time_slot(t)
+        var_day[var.name] = slot.day if slot else t
+    constraints = problem_constraints(prob)
+    for constraint in constraints:
+        names = [var.name for var in constraint.keys()]
+        root = find(names[0])
+        for name in names[1:]:
+            other = find(name)
+            if other != root:
+                parent[other] = root
+    component_day = {}
+    for name in parent:
+        component_day.setdefault(find(name), var_day[name])
+    buckets = defaultdict(lambda: {'vars': [], 'constraints': []})
+    for var in x.values():
+        buckets[component_day[find(var.name)]]['vars'].append(var)
+    for constraint in constraints:
+        day = component_day[find(next(iter(constraint.keys())).name)]
+        buckets[day]['constraints'].append(constraint)
+    subproblems = {}
+    for day, bucket in buckets.items():
+        sub = pulp.LpProblem(f'ClassroomAssignment_{day}', pulp.LpMinimize)
+        sub += pulp.LpAffineExpression([(var, prob.objective.get(var, 0)) for var in bucket['vars']])
+        for constraint in bucket['constraints']:
+            sub.addConstraint(constraint, constraint.name)
+        subproblems[day] = sub
+    return subproblems
+
+def _solve_subproblem(problem_dict, args):
+    _, sub = pulp.LpProblem.from_dict(problem_dict)
+    solve_info = solve_model(sub, args)
+    return solve_info, {var.name: var.varValue for var in sub.variables()}
+
+def solve_decomposed(prob, x, args):
+    subproblems = split_by_day(prob, x)
+    # Parallel workers share one log path otherwise
+    worker_args = argparse.Namespace(**{**vars(args), 'solver_log': None})
+    start = time.perf_counter()
+    values = {}
+    infos = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(_solve_subproblem, sub.to_dict(), worker_args): day for day, sub in subproblems.items()}
+        for future in concurrent.futures.as_completed(futures):
+            infos[futures[future]], sub_values = future.result()
+            values.update(sub_values)
+    wall_time = time.perf_counter() - start
+    for var in x.values():
+        var.varValue = values.get(var.name)
+    statuses = set(info['status'] for info in infos.values())
+    status = 'Optimal' if statuses <= {'Optimal'} else next(s for s in statuses if s != 'Optimal')
+    prob.status = next(k for k, v in pulp.LpStatus.items() if v == status)
+    gaps = [info['gap'] for info in infos.values()]
+    for day in sorted(infos):
+        print(f'  {day}: {format_solve_info(infos[day])}')
+    return {
+        'solver': f"{next(iter(infos.values()))['solver']} x{len(infos)}" if infos else 'none',
+        'status': status,
+        'solution': 'Optimal Solution Found' if status == 'Optimal' else status,
+        'gap': None if any(g is None for g in gaps) else max(gaps, default=0.0),
+        'wall_time': wall_time,
+        'objective': pulp.value(prob.objective),
+    }
+
+# Lazy conflict rows
+# With --lazy-conflicts the model starts with the assignment rows only. Each round solves it,
+# checks the room conflict rows against the solution and adds the violated ones, then re-solves
+# from the previous answer with the clashing course-times left open. Most rooms are too small or
+# too large for most courses and never see a clash, so the rows that are added stay a small part
+# of the full set; once no row is violated the solution is optimal for the full model as well.
+# --time-limit and --gap apply to each round.
+def violated_conflict_rows(conflict_rows, limits, active, values, columns, index):
+    day = index['day']
+
+    def room_day(cols):
+        ct, rid = columns[cols[0]]
+        return rid, day[ct.time_id]
+
+    violated = [i for i, cols in enumerate(conflict_rows)
+                if i not in active and sum(values[j] for j in cols) > limits[i] + 0.5]
+    # A clash pushed out of one time tends to land on the room's next time that day, so the
+    # rows of a room and day go in together
+    room_days = set(room_day(conflict_rows[i]) for i in violated)
+    return [i for i, cols in enumerate(conflict_rows) if i not in active and room_day(cols) in room_days]
+
+def solve_lazy(model, args):
+    x = model['x']
+    prob = model['prob']
+    variables = list(x.values())
+    columns = model['columns']
+    conflict_rows = model['conflict_rows']
+    limits = model['conflict_limits']
+    active = model['lazy_rows']  # conflict rows already in the model, kept across re-solves
+    round_args = args
+    infos = []
+    while True:
+        if prob is None:
+            solve_info = solve_matrix(model, round_args, sorted(active))
+        else:
+            solve_info = solve_model(prob, round_args)
+        infos.append(solve_info)
+        values = [var.varValue for var in variables]
+        if not has_solution(solve_info) or any(v is None for v in values):
+            print(f'  round {len(infos)}: {format_solve_info(solve_info)}, no solution to check')
+            break
+        violated = violated_conflict_rows(conflict_rows, limits, active, values, columns, model['index'])
+        print(f'  round {len(infos)}: {format_solve_info(solve_info)}, {len(violated)} conflict rows added '
+              f'({len(active) + len(violated)} of {len(conflict_rows)})')
+        if not violated:
+            break
+        active.update(violated)
+        if prob is not None:
+            for i in violated:
+                prob += pulp.lpSum([variables[j] for j in conflict_rows[i]]) <= limits[i]
+        # MIP start: every course-time outside the violated rows keeps its room
+        reopened = set((columns[j][0].course, columns[j][0].time) for i in violated for j in conflict_rows[i])
+        for key in reopened:
+            for j in model['candidates'][key]:
+                variables[j].varValue = None
+        round_args = argparse.Namespace(**{**vars(args), 'warm_start': True})
+    last = infos[-1]
+    return {
+        **last,
+        'solver': f"{last['solver']} lazy x{len(infos)}",
+        'wall_time': sum(info['wall_time'] for info in infos),
+    }
+
+def solve_assignment(model, args):
+    if model['lazy_rows'] is not None:
+        return solve_lazy(model, args)
+    if model['prob'] is None:
+        return solve_matrix(model, args)
+    if args.decompose:
+        return solve_decomposed(model['prob'], model['x'], args)
+    return solve_model(model['prob'], args)
+
+# 10. Matrix back end
+# With --backend matrix the model never becomes PuLP expressions: the rows built from the
+# column lists are packed straight into CSR arrays (indptr/indices, all coefficients 1) and
+# handed to scipy.optimize.milp, or to HiGHS in memory through highspy, with no .lp/.mps file.
+# Variable bounds are read back from x, so incremental fixing and closed rooms still apply;
+# neither interface takes a MIP start, so warm starts are ignored here. Without scipy or
+# highspy, or with --decompose (which splits PuLP problems), build_model falls back to PuLP.
+def matrix_solver_name():
+    if milp is not None:
+        return 'scipy-milp'
+    if highspy is not None:
+        return 'highspy'
+    return None
+
+def build_csr_rows(rows):
+    indptr = array.array('l', [0])
+    indices = array.array('l')
+    for cols in rows:
+        indices.extend(cols)
+        indptr.append(len(indices))
+    return indptr, indices
+
+def solve_matrix(model, args, active=None):
+    x = model['x']
+    variables = list(x.values())
+    costs = list(model['costs'].values())
+    conflicts = range(len(model['conflict_rows'])) if active is None else active
+    rows = model['assignment_rows'] + [model['conflict_rows'][i] for i in conflicts]
+    indptr, indices = build_csr_rows(rows)
+    n_eq = len(model['assignment_rows'])
+    row_lower = [1.0] * n_eq + [0.0] * (len(rows) - n_eq)
+    row_upper = [1.0] * n_eq + [float(model['conflict_limits'][i]) for i in conflicts]
+    col_lower = [float(var.lowBound or 0) for var in variables]
+    col_upper = [1.0 if var.upBound is None else float(var.upBound) for var in variables]
+    solver = matrix_solver_name()
+    start = time.perf_counter()
+    if solver == 'scipy-milp':
+        matrix = csr_array((np.ones(len(indices)), np.frombuffer(indices, dtype=np.dtype(indices.typecode)),
+                            np.frombuffer(indptr, dtype=np.dtype(indptr.typecode))), shape=(len(rows), len(variables)))
+        options = {'disp': bool(args.solver_log)}
+        if args.time_limit is not None:
+            options['time_limit'] = args.time_limit
+        if args.gap is not None:
+            options['mip_rel_gap'] = args.gap
+        result = milp(np.array(costs, dtype=float), integrality=np.ones(len(variables)),
+                      bounds=Bounds(col_lower, col_upper),
+                      constraints=LinearConstraint(matrix, row_lower, row_upper), options=options)
+        values = result.x
+        status = {0: 'Optimal', 2: 'Infeasible', 3: 'Unbounded'}.get(result.status, 'Not Solved')
+        gap = finite_gap(getattr(result, 'mip_gap', None))
+    else:
+        h = highspy.Highs()
+        h.setOptionValue('output_flag', bool(args.solver_log))
+        if args.time_limit is not None:
+            h.setOptionValue('time_limit', float(args.time_limit))
+        if args.gap is not None:
+            h.setOptionValue('mip_rel_gap', float(args.gap))
+        if args.threads is not None:
+            h.setOptionValue('threads', int(args.threads))
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(variables)
+        lp.num_row_ = len(rows)
+        lp.col_cost_ = costs
+        lp.col_lower_ = col_lower
+        lp.col_upper_ = col_upper
+        lp.row_lower_ = row_lower
+        lp.row_upper_ = row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.start_ = list(indptr)
+        lp.a_matrix_.index_ = list(indices)
+        lp.a_matrix_.value_ = [1.0] * len(indices)
+        lp.integrality_ = [highspy.HighsVarType.kInteger] * len(variables)
+        h.passModel(lp)
+        h.run()
+        model_status = h.getModelStatus()
+        status = {
+            highspy.HighsModelStatus.kOptimal: 'Optimal',
+            highspy.HighsModelStatus.kInfeasible: 'Infeasible',
+            highspy.HighsModelStatus.kUnbounded: 'Unbounded',
+        }.get(model_status, 'Not Solved')
+        values = h.getSolution().col_value if h.getInfo().primal_solution_status else None
+        gap = finite_gap(h.getInfo().mip_gap)
+    wall_time = time.perf_counter() - start
+    for j, var in enumerate(variables):
+        var.varValue = None if values is None else round(values[j])
+    objective = None
+    if values is not None:
+        objective = sum(cost * var.varValue for cost, var in zip(costs, variables)) + model['fixed_cost']
+    return {
+        'solver': solver,
+        'status': status,
+        'solution': 'Optimal Solution Found' if status == 'Optimal' else ('Solution Found' if values is not None else 'No Solution Found'),
+        'gap': gap if status != 'Optimal' else 0.0,
+        'wall_time': wall_time,
+        'objective': objective,
+    }
+
+# 11. Incremental re-solve
+# Each solve leaves a snapshot of its model inputs and assignment next to the workbook. With
+# --incremental, course-times the new inputs do not touch keep their previous room (fixed by
+# variable bounds) and only the changed course-times, plus the courses sitting in the rooms
+# they compete for at overlapping times, are re-optimized.
+SNAPSHOT_JSON = 'course_assignments.snapshot.json'
+
+def save_snapshot(path, courses, course_times, capacities, course_table, assignment):
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
+    snapshot = {
+        'enrollments': {c: enrollments[course_id[c]] for c in courses},
+        'course_times': {c: list(dict.fromkeys(course_times[c])) for c in courses},
+        'capacities': capacities,
+        'assignment': [[c, t, r] for (c, t), r in assignment.items()],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+
+def load_snapshot(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+# Courses whose enrollment or meeting times changed, that are new, or that sat in a room whose capacity changed
+def diff_snapshot(snapshot, courses, course_times, capacities, course_table):
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
+    old_enrollments = snapshot['enrollments']
+    old_times = snapshot['course_times']
+    old_capacities = snapshot['capacities']
+    changed = set()
+    for c in courses:
+        if c not in old_enrollments or old_enrollments[c] != enrollments[course_id[c]]:
+            changed.add(c)
+        elif old_times.get(c) != list(dict.fromkeys(course_times[c])):
+            changed.add(c)
+    changed_rooms = set(r for r in set(capacities) | set(old_capacities) if capacities.get(r) != old_capacities.get(r))
+    for c, t, r in snapshot['assignment']:
+        if r in changed_rooms:
+            changed.add(c)
+    return changed
+
+# Fix unaffected course-times to their previous room; returns (fixed variables, freed course-times)
+def fix_unaffected(x, snapshot, changed_courses):
+    previous = {(c, t): r for c, t, r in snapshot['assignment']}
+    candidate_rooms = defaultdict(set)
+    for (c, r, t) in x:
+        candidate_rooms[(c, t)].add(r)
+    # Rooms the changed course-times compete for, with the times they would use them
+    contested = defaultdict(list)
+    freed = set()
+    for (c, t), rooms in candidate_rooms.items():
+        if c in changed_courses:
+            freed.add((c, t))
+            for r in rooms:
+                contested[r].append(t)
+    for (c, t), rooms in candidate_rooms.items():
+        if (c, t) in freed:
+            continue
+        r = previous.get((c, t))
+        if r is None or r not in rooms or any(times_overlap(t, t2) for t2 in contested.get(r, ())):
+            freed.add((c, t))
+    fixed = []
+    for (c, t), r in previous.items():
+        if (c, t) not in freed and (c, r, t) in x:
+            x[c, r, t].lowBound = 1
+            fixed.append(x[c, r, t])
+    return fixed, freed
+
+# 12. Heuristic assigner
+# Best-fit-decreasing: course-times are placed largest enrollment first, each into the cheapest
+# free room among its candidates (sorted by objective cost, i.e. by how snugly the room fits);
+# a course-time left without a room evicts one that can move elsewhere. Local search then moves
+# course-times into cheaper free rooms, or swaps two overlapping course-times between their
+# rooms, until a pass finds nothing better. Takes milliseconds;
+# --heuristic uses the result as the answer, --heuristic-start hands it to CBC as a MIP start.
+HEURISTIC_PASSES = 20
+
+# costs[(c, r, t)] = objective coefficient of each variable; returns {(c, t): room}
+def heuristic_assign(costs, course_table, passes=HEURISTIC_PASSES):
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
+    candidates = defaultdict(list)
+    for (c, r, t), cost in costs.items():
+        candidates[(c, t)].append((cost, r))
+    for options in candidates.values():
+        options.sort()
+    occupied = defaultdict(dict)  # room -> {(c, t): t}
+    assignment = {}
+
+    def blockers(r, t):
+        return [key for key, t2 in occupied[r].items() if times_overlap(t, t2)]
+
+    def place(key, r):
+        old = assignment.get(key)
+        if old is not None:
+            del occupied[old][key]
+        assignment[key] = r
+        occupied[r][key] = key[1]
+
+    order = sorted(candidates, key=lambda key: (-enrollments[course_id[key[0]]], len(candidates[key]), key))
+    for key in order:
+        for cost, r in candidates[key]:
+            if not blockers(r, key[1]):
+                place(key, r)
+                break
+    # Repair: make room for a course-time left out by moving the one course-time in its way elsewhere
+    for key in order:
+        if key in assignment:
+            continue
+        for cost, r in candidates[key]:
+            in_the_way = blockers(r, key[1])
+            if len(in_the_way) != 1:
+                continue
+            other = in_the_way[0]
+            moved_to = next((r3 for _, r3 in candidates[other] if r3 != r and not blockers(r3, other[1])), None)
+            if moved_to is not None:
+                place(other, moved_to)
+                place(key, r)
+                break
+
+    for _ in range(passes):
+        improved = False
+        for key in order:
+            if key not in assignment:
+                continue
+            c, t = key
+            r = assignment[key]
+            current = costs[(c, r, t)]
+            for cost, r2 in candidates[key]:
+                if cost >= current:
+                    break
+                in_the_way = blockers(r2, t)
+                if not in_the_way:
+                    place(key, r2)
+                    improved = True
+                    break
+                if len(in_the_way) != 1:
+                    continue
+                other = in_the_way[0]
+                c2, t2 = other
+                if (c2, r, t2) not in costs:
+                    continue
+                if cost + costs[(c2, r, t2)] >= current + costs[(c2, r2, t2)]:
+                    continue
+                if any(k != key for k in blockers(r, t2)):
+                    continue
+                place(key, r2)
+                place(other, r)
+                improved = True
+                break
+        if not improved:
+            break
+    return assignment
+
+# Load a heuristic assignment into x as the solution; returns the solve info main() prints
+def use_heuristic_solution(model, assignment, wall_time):
+    for (c, r, t), var in model['x'].items():
+        var.varValue = 1 if assignment.get((c, t)) == r else 0
+    complete = len(assignment) == len(model['candidates'])
+    return {
+        'solver': 'greedy',
+        'status': 'Heuristic' if complete else 'Incomplete',
+        'solution': pulp.LpSolution[pulp.LpSolutionIntegerFeasible if complete else pulp.LpSolutionNoSolutionFound],
+        'gap': None,
+        'wall_time': wall_time,
+        'objective': sum(model['costs'][(c, r, t)] for (c, t), r in assignment.items()) + model['fixed_cost'],
+    }
+
+# 13. Solution extraction
+# One pass over the solved variables builds assignment[(c, t)] = room (pinned course-times
+# included, rooms of a room class handed out); the reports, the workbook rows and the snapshot
+# all read that map.
+def extract_assignment(x, fixed_assignment, room_classes=None):
+    assignment = dict(fixed_assignment)
+    for (c, r, t), var in x.items():
+        if var.varValue is not None and round(var.varValue) == 1:
+            assignment[(c, t)] = r
+    if room_classes:
+        assignment = assign_class_rooms(assignment, room_classes)
+    return assignment
+
+# Total unused seat-hours of the assigned course-times in course_time_list
+def unused_seat_hours(course_time_list, assignment, capacities, course_table):
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
+    placed = [(c, t, assignment[(c, t)]) for c, t in course_time_list if (c, t) in assignment]
+    if np is None:
+        return sum(max(capacities[r] - enrollments[course_id[c]], 0) * parse_duration(t) for c, t, r in placed)
+    capacity = np.fromiter((capacities[r] for _, _, r in placed), dtype=np.int64, count=len(placed))
+    enrollment = np.take(np.frombuffer(enrollments, dtype=np.dtype(enrollments.typecode)),
+                         [course_id[c] for c, _, _ in placed]).astype(np.int64)
+    duration = np.fromiter((parse_duration(t) for _, t, _ in placed), dtype=np.int64, count=len(placed))
+    return int(np.maximum(capacity - enrollment, 0) @ duration)
+
+# 14. Workbook output
+# Output rows are checked in memory and then streamed into a write-only workbook, so the file is
+# written once and never read back.
+ASSIGNMENTS_XLSX = 'course_assignments.xlsx'
+ASSIGNMENT_COLUMNS = ['Course Code', 'Assigned Room 1', 'Time 1', 'Assigned Room 2', 'Time 2', 'Enrollment',
+                      'Room Capacity 1', 'Room Capacity 2', 'Assignment Status']
+SOLVE_INFO_COLUMNS = ['Solver', 'Status', 'Solution', 'Objective', 'Gap', 'Wall Time (s)']
+
+# Overlapping rooms and course-times given two rooms among the 'Assigned' rows; returns one message per problem
+def verify_assignment_rows(rows):
+    problems = []
+    room_time = defaultdict(list)  # (room, time) -> [course_code]
+    course_room_time = defaultdict(list)  # (course_code, time) -> [room]
+    for code, room1, time1, room2, time2, enrollment, cap1, cap2, status in rows:
+        if status == 'Assigned':
+            if room1 and time1:
+                room_time[(room1, time1)].append(code)
+                course_room_time[(code, time1)].append(room1)
+            if room2 and time2:
+                room_time[(room2, time2)].append(code)
+                course_room_time[(code, time2)].append(room2)
+    # 1. No overlapping courses in the same room at the same time
+    for (room, time_str), codes in room_time.items():
+        if len(codes) > 1:
+            problems.append(f'Overlap: Room {room} at {time_str} assigned to multiple courses: {codes}')
+    # Different time strings in the same room may still overlap (e.g. 12:00-13:50 and 13:00-14:50)
+    room_times_used = defaultdict(list)
+    for (room, time_str) in room_time:
+        room_times_used[room].append(time_str)
+    for room, times_used in room_times_used.items():
+        for i, t1 in enumerate(times_used):
+            for t2 in times_used[i + 1:]:
+                if times_overlap(t1, t2):
+                    problems.append(f'Overlap: Room {room} at {t1} and {t2}: {room_time[(room, t1)] + room_time[(room, t2)]}')
+    # 2. Each course-time assigned to exactly one classroom
+    for (code, time_str), rooms in course_room_time.items():
+        if len(rooms) > 1:
+            problems.append(f'Course {code} at {time_str} assigned to multiple rooms: {rooms}')
+    return problems
+
+def write_assignments_workbook(path, rows, solve_info):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Assignments')
+    ws.append(ASSIGNMENT_COLUMNS)
+    for row in rows:
+        ws.append(row)
+    # Solve status alongside the assignments
+    info_ws = wb.create_sheet('Solve Info')
+    info_ws.append(SOLVE_INFO_COLUMNS)
+    info_ws.append([solve_info['solver'], solve_info['status'], solve_info['solution'], solve_info['objective'],
+                    solve_info['gap'], round(solve_info['wall_time'], 3)])
+    wb.save(path)
+
+# With --parquet-dir: the inputs as load_inputs() returned them, under names the loaders accept
+# again, and the assignment rows with the solve info in the file metadata
+ASSIGNMENTS_PARQUET = 'assignments.parquet'
+
+def write_parquet_tables(directory, inputs, rows, solve_info):
+    if pq is None:
+        print('Parquet output needs pyarrow (pip install pyarrow); skipping')
+        return
+    os.makedirs(directory, exist_ok=True)
+    write_parquet_rows(os.path.join(directory, 'courses.parquet'), ENROLLMENT_COLUMNS, list(inputs['enrollments'].items()))
+    write_parquet_rows(os.path.join(directory, 'rooms.parquet'), ROOM_COLUMNS, list(inputs['capacities'].items()))
+    for name, key in (('schedule.parquet', 'schedule_main'), ('graduate.parquet', 'schedule_grad')):
+        write_parquet_rows(os.path.join(directory, name), SCHEDULE_COLUMNS,
+                           [tuple(s[k] for k in SCHEDULE_COLUMNS) for s in inputs[key]])
+    # Blank cells become nulls, so the capacity columns stay integers
+    write_parquet_rows(os.path.join(directory, ASSIGNMENTS_PARQUET), ASSIGNMENT_COLUMNS,
+                       [[None if v == '' else v for v in row] for row in rows],
+                       metadata={'solve_info': json.dumps(solve_info)})
+    print(f'Parquet tables saved to {directory}')
+
+# 15. Pipeline phases
+# main() runs load_inputs -> prepare_data -> build_model -> solve -> reports. The phases pass plain
+# dicts, so a long-running caller (whatif_server.py) can keep the parsed inputs and the built model
+# in memory and only redo the phases a change touches.
+def load_inputs(args):
+    cache_dir = None if args.no_input_cache else INPUT_CACHE_DIR
+    return {
+        'enrollments': load_course_enrollments_cached(args.courses_csv, cache_dir),
+        'capacities': load_room_capacities_cached(args.rooms_csv, cache_dir),
+        'schedule_main': load_course_schedule_cached(args.schedule_docx, cache_dir),
+        'schedule_grad': load_course_schedule_cached(args.graduate_docx, cache_dir),
+    }
+
+# Apply the special cases (merged sections, lab pre-assignment, graduate and two-day meetings) to the inputs;
+# enrollment_overrides replace enrollments by their merged course code (e.g. {'ARCH216': 60})
+def prepare_data(inputs, enrollment_overrides=None):
+    enrollments_raw = dict(inputs['enrollments'])
+    capacities = dict(inputs['capacities'])
+
 
     # Special case: merge all ENS207-3.* and ENS207-6.* into ENS207
     ens207_total = 0
@@ -162,9 +1356,12 @@ def main():
             del enrollments_raw[k]
     if arch216_total > 0:
         enrollments_raw['ARCH216'] = arch216_total
+    if enrollment_overrides:
+        enrollments_raw.update(enrollment_overrides)
 
-    schedule_main = load_course_schedule(SCHEDULE_DOCX)
-    schedule_grad = load_course_schedule(GRADUATE_DOCX)
+    # The special cases below rewrite rows in place, so work on copies
+    schedule_main = [dict(s) for s in inputs['schedule_main']]
+    schedule_grad = [dict(s) for s in inputs['schedule_grad']]
     schedule = schedule_main + schedule_grad
 
     # --- Ensure POLS304.1 is present in the schedule if in enrollments but missing from schedule ---
@@ -224,40 +1421,10 @@ def main():
         deduped_schedule.append(s)
     schedule = deduped_schedule
 
-    # Helper: get enrollment for a sectioned course code
-    def get_enrollment(code):
-        if code in enrollments_raw:
-            return enrollments_raw[code]
-        base = code.split('.')[0]
-        if base in enrollments_raw:
-            return enrollments_raw[base]
-        return None
-
-    # Helper: parse duration from time string (e.g., 'Wed. 12:00-14:50')
-    def parse_duration(time_str):
-        match = re.search(r'(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})', time_str)
-        if not match:
-            return 1  # fallback if parsing fails
-        h1, m1, h2, m2 = map(int, match.groups())
-        start = h1 * 60 + m1
-        end = h2 * 60 + m2
-        duration_min = end - start
-        if duration_min <= 60:
-            return 1
-        elif duration_min > 60 and duration_min <= 120:
-            return 2
-        elif duration_min > 120 and duration_min <= 180:
-            return 3
-        elif duration_min > 180 and duration_min <= 240:
-            return 4
-        elif duration_min > 240 and duration_min <= 300:
-            return 5
-        elif duration_min > 300 and duration_min <= 360:
-            return 6
-        elif duration_min > 360 and duration_min <= 420:
-            return 7
-        else:
-            return 7  # cap at 7 hours
+    # Enrollment by course id, with section -> base resolution done once
+    course_table = build_course_table(enrollments_raw, (s['course_code'] for s in schedule))
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
 
     # --- Special Classroom Pre-Assignment Logic ---
     # Identify all computer lab rooms
@@ -272,19 +1439,20 @@ def main():
 
     # Build a set of (course, time) pairs to pre-assign
     preassigned = []  # list of dicts: {course_code, time, room}
-    used_lab_times = set()  # (room, time) pairs already taken
+    used_lab_times = defaultdict(list)  # room -> meeting times already taken
     # Special case: ENS207 must be assigned to B F1.25 Computer Lab regardless of capacity
     for s in schedule:
         if s['course_code'] == 'ENS207':
             preassigned.append({'course_code': 'ENS207', 'time': s['time'], 'room': 'B F1.25 Computer Lab'})
-            used_lab_times.add(('B F1.25 Computer Lab', s['time']))
+            used_lab_times['B F1.25 Computer Lab'].append(s['time'])
         elif s['course_code'] in special_lab_courses:
             # Assign to first available computer lab room at that time (normal logic)
             assigned = False
             for lab_room in computer_lab_rooms:
-                if (lab_room, s['time']) not in used_lab_times and capacities[lab_room] >= get_enrollment(s['course_code']):
+                lab_free = not any(times_overlap(s['time'], t2) for t2 in used_lab_times[lab_room])
+                if lab_free and capacities[lab_room] >= enrollments[course_id[s['course_code']]]:
                     preassigned.append({'course_code': s['course_code'], 'time': s['time'], 'room': lab_room})
-                    used_lab_times.add((lab_room, s['time']))
+                    used_lab_times[lab_room].append(s['time'])
                     assigned = True
                     break
             if not assigned:
@@ -299,7 +1467,7 @@ def main():
     course_times = defaultdict(list)
     for s in schedule_for_milp:
         course_times[s['course_code']].append(s['time'])
-    courses = list(set(s['course_code'] for s in schedule_for_milp if get_enrollment(s['course_code']) is not None))
+    courses = list(set(s['course_code'] for s in schedule_for_milp if s['course_code'] in course_id))
     rooms = list(capacities.keys())
     times = list(set(s['time'] for s in schedule_for_milp))
 
@@ -312,7 +1480,7 @@ def main():
         code = f'{gc}.1'
         if code in enrollments_raw:
             grad_needed.add(code)
-    grad_schedule = load_course_schedule(GRADUATE_DOCX)
+    grad_schedule = inputs['schedule_grad']
     for gc in grad_needed:
         found = any(s['course_code'] == gc for s in schedule)
         if not found:
@@ -367,7 +1535,7 @@ def main():
         code = f'{gc}.1'
         if code in enrollments_raw:
             grad_needed.add(code)
-    grad_schedule = load_course_schedule(GRADUATE_DOCX)
+    grad_schedule = inputs['schedule_grad']
     for gc in grad_needed:
         found = any(s['course_code'] == gc for s in schedule)
         if not found:
@@ -396,673 +1564,221 @@ def main():
     times = list(set(s['time'] for s in schedule))
     course_time = {s['course_code']: s['time'] for s in schedule}
 
-    # Decision variables: x[c, r, t] = 1 if course c assigned to room r at time t
-    x = pulp.LpVariable.dicts('assign', ((c, r, t) for c in courses for r in rooms for t in course_times[c]), cat='Binary')
+    return {
+        'enrollments_raw': enrollments_raw,
+        'capacities': capacities,
+        'schedule': schedule,
+        'course_table': course_table,
+        'computer_lab_rooms': computer_lab_rooms,
+        'preassigned': preassigned,
+        'courses': courses,
+        'rooms': rooms,
+        'course_times': course_times,
+        'course_duration': course_duration,
+    }
 
-    # Model
-    prob = pulp.LpProblem('ClassroomAssignment', pulp.LpMinimize)
+# Room rules, variables, objective and constraints for the prepared data
+def build_model(data, args):
+    capacities = data['capacities']
+    course_table = data['course_table']
+    computer_lab_rooms = data['computer_lab_rooms']
+    preassigned = data['preassigned']
+    courses = data['courses']
+    course_times = data['course_times']
+    course_duration = data['course_duration']
+
+    # --- Room rules (room_rules.csv), compiled into pins and exclusions in one pass ---
+    room_rules = load_room_rules(args.room_rules)
+    pinned, excluded, room_owners, status_rules, preferences = compile_room_rules(
+        room_rules, courses, course_times, capacities, course_table, {'computer_labs': computer_lab_rooms}, preassigned,
+        soft_preferences=args.soft_preferences, preference_weight=args.preference_weight)
+
+    for r, t1, owners1, t2, owners2 in find_pin_conflicts(room_owners):
+        print(f'Warning: room {r} is pinned to {owners1} at {t1} and {owners2} at {t2}')
+
+    # Pinned course-times are settled before the model: fixed_assignment[(c, t)] = room
+    course_set = set(courses)
+    fixed_assignment = {
+        (c, t): r for (c, t), r in pinned.items()
+        if c in course_set and r in capacities and t in course_times[c]
+    }
 
-    # Objective: Minimize total unused seat-hours (including duration)
-    prob += pulp.lpSum([
-        x[c, r, t] * (capacities[r] - get_enrollment(c)) * course_duration.get((c, t), 1)
-        for c in courses for r in rooms for t in course_times[c] if capacities[r] >= get_enrollment(c)
-    ])
+    # Room classes: equal generic rooms become one model room, named in the class table
+    room_classes = None
+    model_capacities = capacities
+    use_classes = args.room_classes and not (args.heuristic or args.heuristic_start or args.incremental)
+    if args.room_classes and not use_classes:
+        print('Room classes do not combine with --heuristic, --heuristic-start or --incremental; modelling every room')
+    if use_classes:
+        named_rooms = set(pinned.values()) | set(r for (r, _) in room_owners)
+        named_rooms.update(room for room, _ in preferences.values())
+        for _, label_rooms in status_rules.values():
+            named_rooms.update(label_rooms)
+        room_classes = group_room_classes(capacities, excluded, named_rooms)
+        room_class = {r: name for name, rooms in room_classes.items() for r in rooms}
+        model_capacities = {name: capacities[rooms[0]] for name, rooms in room_classes.items()}
+        class_sets = {}  # exclusion sets are shared between course-times, so map each one once
+        for key, rooms in excluded.items():
+            if id(rooms) not in class_sets:
+                class_sets[id(rooms)] = set(room_class[r] for r in rooms if r in room_class)
+            excluded[key] = class_sets[id(rooms)]
+        print(f'Room classes: {len(capacities)} rooms modelled as {len(room_classes)}')
 
-    # Constraints
-    # 1. Each course at each time assigned to exactly one room (with enough capacity)
-    for c in courses:
-        for t in course_times[c]:
-            prob += pulp.lpSum([x[c, r, t] for r in rooms if capacities[r] >= get_enrollment(c)]) == 1
+    # Decision variables: x[c, r, t] = 1 if course c assigned to room r at time t
+    # Only feasible triples are created (room fits, not excluded, not blocked by a pin)
+    index = build_model_index(courses, course_times, model_capacities, course_table, extra_times=[t for (_, t) in room_owners])
+    x, columns = build_assignment_variables(index, course_table, pinned, excluded, room_owners)
+
+    # Objective: Minimize total unused seat-hours (including duration); pinned course-times add a constant
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
+    fixed_cost = sum(
+        max(capacities[r] - enrollments[course_id[c]], 0) * course_duration.get((c, t), 1)
+        for (c, t), r in fixed_assignment.items()
+    )
+    capacity = index['capacity']
+    duration = index['duration']
+    costs = {
+        key: max(capacity[rid] - enrollments[ct.course_id], 0) * duration[ct.time_id]
+        for key, (ct, rid) in zip(x, columns)
+    }
+    # Soft preferences: the preferred room earns its weight per meeting hour
+    for (c, t), (room, weight) in preferences.items():
+        if (c, room, t) in costs:
+            costs[(c, room, t)] -= weight * course_duration.get((c, t), 1)
+
+    # Constraints, as lists of column indices
+    # 1. Each course at each time assigned to exactly one of its candidate rooms
+    candidates = defaultdict(list)
+    for j, (ct, rid) in enumerate(columns):
+        candidates[(ct.course, ct.time)].append(j)
+    assignment_rows = list(candidates.values())
 
     # 2. No overlapping courses in the same room at the same time
-    for r in rooms:
-        all_times = set(t for c in courses for t in course_times[c])
-        for t in all_times:
-            prob += pulp.lpSum([
-                x[c, r, t] for c in courses if t in course_times[c]
-            ]) <= 1
-
-    # --- Add fixed assignments for preassigned special lab courses ---
-    for p in preassigned:
-        if p['room']:
-            # Fix variable to 1 for preassigned, and 0 for all other rooms at that time
-            if p['course_code'] in x and p['room'] in rooms and p['time'] in course_times.get(p['course_code'], []):
-                prob += x[p['course_code'], p['room'], p['time']] == 1
-                for r in rooms:
-                    if r != p['room']:
-                        if (p['course_code'], r, p['time']) in x:
-                            prob += x[p['course_code'], r, p['time']] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != p['course_code'] and p['time'] in course_times.get(c2, []):
-                    if (c2, p['room'], p['time']) in x:
-                        prob += x[c2, p['room'], p['time']] == 0
-    # --- End fixed assignments ---
-
-    # --- Force ECON108.1 to be assigned to B F1.2 - Class/ECON Lab (ignore capacity) ---
-    econ_room = 'B F1.2 - Class/ECON Lab'
-    econ_course = 'ECON108.1'
-    for t in course_times.get(econ_course, []):
-        for r in rooms:
-            if r == econ_room:
-                if (econ_course, r, t) in x:
-                    prob += x[econ_course, r, t] == 1
-            else:
-                if (econ_course, r, t) in x:
-                    prob += x[econ_course, r, t] == 0
-        for c2 in courses:
-            if c2 != econ_course and t in course_times.get(c2, []):
-                if (c2, econ_room, t) in x:
-                    prob += x[c2, econ_room, t] == 0
-    # --- End force for ECON108.1 ---
-
-    # --- Add fixed assignment for BUS602.1 and MBA581.1 to B F1.2 - Class/ECON Lab (force even if capacity is not enough) ---
-    econ_room = 'B F1.2 - Class/ECON Lab'
-    bus_mba_courses = ['BUS602.1', 'MBA581.1']
-    for course in bus_mba_courses:
-        for t in course_times.get(course, []):
-            for r in rooms:
-                if r == econ_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, econ_room, t) in x:
-                        prob += x[c2, econ_room, t] == 0
-    # --- End fixed assignment for BUS602.1 and MBA581.1 ---
-
-    # --- Force ECON506.1 and ECON601.1 to be assigned together in B F1.2 - Class/ECON Lab at the same time (force even if capacity is not enough) ---
-    econ_pair = ['ECON506.1', 'ECON601.1', 'ECON 601.1']
-    econ506_times = set(course_times.get('ECON506.1', []))
-    econ601_times = set(course_times.get('ECON601.1', [])) | set(course_times.get('ECON 601.1', []))
-    common_times = econ506_times & econ601_times
-    for t in common_times:
-        for course in ['ECON506.1', 'ECON601.1', 'ECON 601.1']:
-            for r in rooms:
-                if r == econ_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-        for c2 in courses:
-            if c2 not in econ_pair and t in course_times.get(c2, []):
-                if (c2, econ_room, t) in x:
-                    prob += x[c2, econ_room, t] == 0
-    # --- End force ECON506.1 and ECON601.1 together ---
-
-    # --- Add preferred assignment for Multimedia Studio courses ---
-    multimedia_room = 'A B.1 - VACD Multimedia Studio'
-    multimedia_courses = ['ELIT103.1', 'ELIT103.2', 'VA312.1', 'VA312.2', 'VA451.1']
-    force_multimedia_courses = ['VA312.1', 'VA312.2']
-    for course in multimedia_courses:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            if course in force_multimedia_courses:
-                # Force assignment to multimedia studio regardless of capacity
-                for r in rooms:
-                    if r == multimedia_room:
-                        if (course, r, t) in x:
-                            prob += x[course, r, t] == 1
-                    else:
-                        if (course, r, t) in x:
-                            prob += x[course, r, t] == 0
-                # Block this room at this time for all other courses
-                for c2 in courses:
-                    if c2 != course and t in course_times.get(c2, []):
-                        if (c2, multimedia_room, t) in x:
-                            prob += x[c2, multimedia_room, t] == 0
-            elif enrollment is not None and multimedia_room in capacities:
-                if capacities[multimedia_room] >= enrollment:
-                    # Force assignment to multimedia studio and block all other rooms
-                    for r in rooms:
-                        if r == multimedia_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 1
-                        else:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Block this room at this time for all other courses
-                    for c2 in courses:
-                        if c2 != course and t in course_times.get(c2, []):
-                            if (c2, multimedia_room, t) in x:
-                                prob += x[c2, multimedia_room, t] == 0
-                else:
-                    # Do not allow assignment to multimedia studio, must assign to another room
-                    for r in rooms:
-                        if r == multimedia_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Ensure assignment to some other room with enough capacity
-                    prob += pulp.lpSum([x[course, r, t] for r in rooms if r != multimedia_room and capacities[r] >= enrollment]) == 1
-    # --- End preferred assignment for Multimedia Studio courses ---
-
-    # --- Add preferred assignment for FBA Graduate Seminar Room courses ---
-    fba_room = 'B F1.1 FBA Graduate Seminar Room'
-    fba_courses = ['IBF407.1', 'MAN328.1', 'MAN406.1']
-    for course in fba_courses:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            if enrollment is not None and fba_room in capacities:
-                if capacities[fba_room] >= enrollment:
-                    # Force assignment to FBA room and block all other rooms
-                    for r in rooms:
-                        if r == fba_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 1
-                        else:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Block this room at this time for all other courses
-                    for c2 in courses:
-                        if c2 != course and t in course_times.get(c2, []):
-                            if (c2, fba_room, t) in x:
-                                prob += x[c2, fba_room, t] == 0
-                else:
-                    # Do not allow assignment to FBA room, must assign to another room
-                    for r in rooms:
-                        if r == fba_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Ensure assignment to some other room with enough capacity
-                    prob += pulp.lpSum([x[course, r, t] for r in rooms if r != fba_room and capacities[r] >= enrollment]) == 1
-    # --- End preferred assignment for FBA Graduate Seminar Room courses ---
-
-    # --- Add preferred assignment for MAC Studio courses ---
-    mac_room = 'B F1.24 (MAC Studio)'
-    mac_courses = [
-        'VA211.1', 'VA211.2', 'VA304.1', 'VA315.1', 'VA323.1', 'VA323.2',
-        'VA406.1', 'VA416.1', 'VA443.1', 'VA452.1', 'VA455.1'
-    ]
-    mac_courses_set = set(mac_courses)
-    force_mac_courses = set(['VA406.1'])
-    for course in mac_courses:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            # Only assign if room exists
-            if mac_room in capacities:
-                if course in force_mac_courses:
-                    # Force assignment to MAC Studio regardless of capacity
-                    for r in rooms:
-                        if r == mac_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 1
-                        else:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Block this room at this time for all other courses
-                    for c2 in courses:
-                        if c2 != course and t in course_times.get(c2, []):
-                            if (c2, mac_room, t) in x:
-                                prob += x[c2, mac_room, t] == 0
-                elif capacities[mac_room] >= (enrollment or 0):
-                    # Force assignment to MAC Studio and block all other rooms
-                    for r in rooms:
-                        if r == mac_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 1
-                        else:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Block this room at this time for all other courses
-                    for c2 in courses:
-                        if c2 != course and t in course_times.get(c2, []):
-                            if (c2, mac_room, t) in x:
-                                prob += x[c2, mac_room, t] == 0
-                else:
-                    # Do not allow assignment to MAC Studio, must assign to another room
-                    for r in rooms:
-                        if r == mac_room:
-                            if (course, r, t) in x:
-                                prob += x[course, r, t] == 0
-                    # Ensure assignment to some other room with enough capacity
-                    prob += pulp.lpSum([x[course, r, t] for r in rooms if r != mac_room and capacities[r] >= (enrollment or 0)]) == 1
-    # --- End preferred assignment for MAC Studio courses ---
-
-    # --- Add preferred assignment for VACD Drawing Studio courses ---
-    drawing_room = 'A B.16 - VACD Drawing Studio'
-    drawing_courses = ['VA104.1', 'VA104.2', 'VA310.1']
-    drawing_courses_set = set(['VA104.1', 'VA104.2', 'VA310.1'])
-    for course in drawing_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to Drawing Studio regardless of capacity
-            for r in rooms:
-                if r == drawing_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, drawing_room, t) in x:
-                        prob += x[c2, drawing_room, t] == 0
-    # --- End preferred assignment for VACD Drawing Studio courses ---
-
-    # --- Add preferred assignment for B F1.10 Class/ART Studio courses ---
-    b_f1_10_room = 'B F1.10 Class/ART Studio'
-    b_f1_10_courses = ['VA217.1', 'VA217.2', 'VA217.3', 'VA334.1']
-    b_f1_10_courses_set = set(b_f1_10_courses)
-    for course in b_f1_10_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to B F1.10 Class/ART Studio regardless of capacity
-            for r in rooms:
-                if r == b_f1_10_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, b_f1_10_room, t) in x:
-                        prob += x[c2, b_f1_10_room, t] == 0
-    # --- End preferred assignment for B F1.10 Class/ART Studio courses ---
-
-    # --- Add preferred assignment for A F3.10 - Architecture Classroom courses ---
-    a_f3_10_room = 'A F3.10 - Architecture Classroom'
-    a_f3_10_courses_set = set(['ARCH510.1', 'ARCH517.1', 'ARCH569.1', 'ARCH101.1', 'ARCH307.1', 'ARCH304.1', 'ARCH109.2'])
-    for course in a_f3_10_courses_set:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            # Force assignment to A F3.10 - Architecture Classroom regardless of capacity
-            for r in rooms:
-                if r == a_f3_10_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, a_f3_10_room, t) in x:
-                        prob += x[c2, a_f3_10_room, t] == 0
-    # --- End preferred assignment for A F3.10 - Architecture Classroom courses ---
-
-    # --- Add preferred assignment for A B.13 - Class/PSY Lab courses ---
-    a_b_13_room = 'A B.13 - Class/PSY Lab'
-    a_b_13_courses_set = set(['PSY519.1', 'PSY524.1', 'PSY529.1'])
-    for course in a_b_13_courses_set:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            # Force assignment to A B.13 - Class/PSY Lab regardless of capacity
-            for r in rooms:
-                if r == a_b_13_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, a_b_13_room, t) in x:
-                        prob += x[c2, a_b_13_room, t] == 0
-    # --- End preferred assignment for A B.13 - Class/PSY Lab courses ---
-
-    # --- Add preferred assignment for CS511.1 and MBA535.1 to B F1.25 Computer Lab if possible, else any available computer lab ---
-    cs_mba_lab_courses = ['CS511.1', 'MBA535.1']
-    preferred_lab = 'B F1.25 Computer Lab'
-    for course in cs_mba_lab_courses:
-        for t in course_times.get(course, []):
-            enrollment = get_enrollment(course)
-            # Check if preferred_lab is already preassigned or forced to another course at this time
-            preferred_lab_taken = False
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, preferred_lab, t) in x:
-                        if c2 in special_lab_courses or c2 in cs_mba_lab_courses:
-                            preferred_lab_taken = True
-                            break
-            if not preferred_lab_taken and preferred_lab in computer_lab_rooms and capacities[preferred_lab] >= (enrollment or 0):
-                for r in rooms:
-                    if r == preferred_lab:
-                        if (course, r, t) in x:
-                            prob += x[course, r, t] == 1
-                    elif r in computer_lab_rooms:
-                        if (course, r, t) in x:
-                            prob += x[course, r, t] == 0
-                for c2 in courses:
-                    if c2 != course and t in course_times.get(c2, []):
-                        if (c2, preferred_lab, t) in x:
-                            prob += x[c2, preferred_lab, t] == 0
-            else:
-                available_labs = [r for r in computer_lab_rooms if capacities[r] >= (enrollment or 0)]
-                prob += pulp.lpSum([x[course, r, t] for r in available_labs]) == 1
-                for r in rooms:
-                    if r not in computer_lab_rooms:
-                        if (course, r, t) in x:
-                            prob += x[course, r, t] == 0
-    # --- End preferred assignment for CS511.1 and MBA535.1 ---
-
-    # --- Add fixed assignment for CS509.1 to A F1.4 - Class/Laboratory ---
-    cs509_course = 'CS509.1'
-    cs509_room = 'A F1.4 - Class/Laboratory'
-    for t in course_times.get(cs509_course, []):
-        for r in rooms:
-            if r == cs509_room:
-                if (cs509_course, r, t) in x:
-                    prob += x[cs509_course, r, t] == 1
-            else:
-                if (cs509_course, r, t) in x:
-                    prob += x[cs509_course, r, t] == 0
-        # Block this room at this time for all other courses
-        for c2 in courses:
-            if c2 != cs509_course and t in course_times.get(c2, []):
-                if (c2, cs509_room, t) in x:
-                    prob += x[c2, cs509_room, t] == 0
-    # --- End fixed assignment for CS509.1 ---
-
-    # --- Add fixed assignment for VA502.1, VA517.1, VA519.1 to B F1.24 (MAC Studio) ---
-    mac_grad_courses = ['VA502.1', 'VA517.1', 'VA519.1']
-    mac_room = 'B F1.24 (MAC Studio)'
-    for course in mac_grad_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to MAC Studio regardless of capacity
-            for r in rooms:
-                if r == mac_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, mac_room, t) in x:
-                        prob += x[c2, mac_room, t] == 0
-    # --- End fixed assignment for VA502.1, VA517.1, VA519.1 ---
-
-    # --- Add fixed assignment for ARCH100.1, ARCH108.1, ARCH201.1 to A F3.8 - Big Architecture Studio ---
-    big_arch_room = 'A F3.8 - Big Architecture Studio'
-    big_arch_courses = ['ARCH100.1', 'ARCH108.1', 'ARCH201.1']
-    for course in big_arch_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to Big Architecture Studio regardless of capacity
-            for r in rooms:
-                if r == big_arch_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, big_arch_room, t) in x:
-                        prob += x[c2, big_arch_room, t] == 0
-    # --- End fixed assignment for ARCH100.1, ARCH108.1, ARCH201.1 ---
-
-    # --- Add fixed assignment for ARCH108.2, ARCH202.1, ARCH303.2, ARCH308.1 to A F3.7 - Small Architecture Studio ---
-    small_arch_room = 'A F3.7 - Small Architecture Studio'
-    small_arch_courses = ['ARCH108.2', 'ARCH202.1', 'ARCH303.2', 'ARCH308.1', 'ARCH106.1']
-    for course in small_arch_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to Small Architecture Studio regardless of capacity
-            for r in rooms:
-                if r == small_arch_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, small_arch_room, t) in x:
-                        prob += x[c2, small_arch_room, t] == 0
-    # --- End fixed assignment for ARCH108.2, ARCH202.1, ARCH303.2, ARCH308.1, ARCH106.1 ---
-
-    # --- Add fixed assignment for ARCH211.1, ARCH303.1, ARCH403.1, ARCH405.1, ARCH412.1 to A F2.16 - Architecture Studio ---
-    f2_16_room = 'A F2.16 - Architecture Studio'
-    f2_16_courses = ['ARCH211.1', 'ARCH303.1', 'ARCH403.1', 'ARCH405.1', 'ARCH412.1']
-    for course in f2_16_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to A F2.16 - Architecture Studio regardless of capacity
-            for r in rooms:
-                if r == f2_16_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, f2_16_room, t) in x:
-                        prob += x[c2, f2_16_room, t] == 0
-    # --- End fixed assignment for ARCH211.1, ARCH303.1, ARCH403.1, ARCH405.1, ARCH412.1 ---
-
-    # --- Add fixed assignment for ARCH202.3, ARCH304.2, ARCH414.1 to A F2.8 - Drawing Studio ---
-    f2_8_room = 'A F2.8 - Drawing Studio'
-    f2_8_courses = ['ARCH202.3', 'ARCH304.2', 'ARCH414.1', 'ARCH109.1']
-    for course in f2_8_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to A F2.8 - Drawing Studio regardless of capacity
-            for r in rooms:
-                if r == f2_8_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, f2_8_room, t) in x:
-                        prob += x[c2, f2_8_room, t] == 0
-    # --- End fixed assignment for ARCH202.3, ARCH304.2, ARCH414.1 ---
-
-    # --- Add fixed assignment for ARCH201.2 to A B.8 - Fabrication Lab ---
-    fabrication_lab_room = 'A B.8 - Fabrication Lab'
-    fabrication_lab_courses = ['ARCH201.2']
-    for course in fabrication_lab_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to A B.8 - Fabrication Lab regardless of capacity
-            for r in rooms:
-                if r == fabrication_lab_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, fabrication_lab_room, t) in x:
-                        prob += x[c2, fabrication_lab_room, t] == 0
-    # --- End fixed assignment for ARCH201.2 ---
-
-    # --- Add fixed assignment for ARCH110.1 to A B.16 - VACD Drawing Studio ---
-    vacd_drawing_room = 'A B.16 - VACD Drawing Studio'
-    vacd_drawing_courses = ['ARCH110.1']
-    for course in vacd_drawing_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to A B.16 - VACD Drawing Studio regardless of capacity
-            for r in rooms:
-                if r == vacd_drawing_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, vacd_drawing_room, t) in x:
-                        prob += x[c2, vacd_drawing_room, t] == 0
-    # --- End fixed assignment for ARCH110.1 ---
-
-    # --- Add fixed assignment for ARCH208.1, ARCH208.2, ARCH216, ARCH360.1 to A F1.3 - Computer Lab ---
-    af13_lab_room = 'A F1.3 - Computer Lab'
-    af13_lab_courses = ['ARCH208.1', 'ARCH208.2', 'ARCH216', 'ARCH360.1']
-    for course in af13_lab_courses:
-        for t in course_times.get(course, []):
-            # Force assignment to A F1.3 - Computer Lab regardless of capacity
-            for r in rooms:
-                if r == af13_lab_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-            # Block this room at this time for all other courses
-            for c2 in courses:
-                if c2 != course and t in course_times.get(c2, []):
-                    if (c2, af13_lab_room, t) in x:
-                        prob += x[c2, af13_lab_room, t] == 0
-    # --- End fixed assignment for ARCH208.1, ARCH208.2, ARCH216, ARCH360.1 ---
-
-    # --- Special case: Assign ARCH210.1, ARCH311.1, ARCH358.1 to combined studio, allowing overlap for ARCH311.1 and ARCH358.1 ---
-    combined_studio_room = 'A F3.7 - Small Architecture Studio & A F3.8 - Big Architecture Studio'
-    # 1. Force ARCH311.1 and ARCH358.1 to overlap in the combined studio at their common time(s)
-    arch311_358_times = set(course_times.get('ARCH311.1', [])) & set(course_times.get('ARCH358.1', []))
-    for t in arch311_358_times:
-        for course in ['ARCH311.1', 'ARCH358.1']:
-            for r in rooms:
-                if r == combined_studio_room:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 1
-                else:
-                    if (course, r, t) in x:
-                        prob += x[course, r, t] == 0
-        # Block all other courses from this room at this time
-        for c2 in courses:
-            if c2 not in ['ARCH311.1', 'ARCH358.1'] and t in course_times.get(c2, []):
-                if (c2, combined_studio_room, t) in x:
-                    prob += x[c2, combined_studio_room, t] == 0
-    # 2. Assign ARCH210.1 to the combined studio at its scheduled time (no overlap allowed)
-    for t in course_times.get('ARCH210.1', []):
-        for r in rooms:
-            if r == combined_studio_room:
-                if ('ARCH210.1', r, t) in x:
-                    prob += x['ARCH210.1', r, t] == 1
-            else:
-                if ('ARCH210.1', r, t) in x:
-                    prob += x['ARCH210.1', r, t] == 0
-        # Block this room at this time for all other courses
-        for c2 in courses:
-            if c2 != 'ARCH210.1' and t in course_times.get(c2, []):
-                if (c2, combined_studio_room, t) in x:
-                    prob += x[c2, combined_studio_room, t] == 0
-    # --- End special case for combined studio ---
-
-    # --- Add fixed assignment for MATH201.1 to B F1.23 - Amphitheater I ---
-    math201_room = 'B F1.23 - Amphitheater I'
-    math201_course = 'MATH201.1'
-    for t in course_times.get(math201_course, []):
-        # Force assignment to Amphitheater regardless of capacity
-        for r in rooms:
-            if r == math201_room:
-                if (math201_course, r, t) in x:
-                    prob += x[math201_course, r, t] == 1
-            else:
-                if (math201_course, r, t) in x:
-                    prob += x[math201_course, r, t] == 0
-        # Block this room at this time for all other courses
-        for c2 in courses:
-            if c2 != math201_course and t in course_times.get(c2, []):
-                if (c2, math201_room, t) in x:
-                    prob += x[c2, math201_room, t] == 0
-    # --- End fixed assignment for MATH201.1 ---
-
-    # --- Block regular courses from being assigned to specialized classrooms ---
-    specialized_classrooms = [
-        'B F1.25 Computer Lab',
-        'A F1.18 - Computer Lab',
-        'A F1.3 - Computer Lab',
-        'A F1.4 - Class/Laboratory',
-        'A F2.16 - Architecture Studio',
-        'RC1.4 - Computer Laboratory',
-        'A F3.7 - Small Architecture Studio & A F3.8 - Big Architecture Studio',
-        'A F3.10 - Architecture Classroom',
-        'A F3.7 - Small Architecture Studio',
-        'A F3.8 - Big Architecture Studio',
-        'B F1.24 (MAC Studio)',
-        'A B.16 - VACD Drawing Studio',
-        'A B.1 - VACD Multimedia Studio',
-        'A F2.8 - Drawing Studio',
-        'A B.13 - Class/PSY Lab',
-        'A B.8 - Fabrication Lab',
-        'A B.2 - EE Lab',
-        'B F1.1 FBA Graduate Seminar Room',
-        'B F1.10 Class/ART Studio',
-        'B F1.2 - Class/ECON Lab',
-        'B F2.27 Creative Writing and Translation Studio',
-        'Sports Hall',
-        'RC.G1 - GBE Laboratory I',
-        'RC.G2 - GBE II',
-        'RC.G3 - GBE III',
-        'RC.G4 - GBE IV',
-        'RC.G5 - ME Laboratory',
-        'RC1.3 - GSM and Network Laboratories',
-        'RC1.5 - Electronic Laboratory',
-        'RC1.6 - Physics Laboratory',
-        'B F1.35 FBA Conference Room',
-        'B F1.35 FBA Conference Room & B F1.2 - Class/ECON Lab',
-        'A F3.7 - Small Architecture Studio & A F3.10 - Architecture Classroom',
-        'A F2.8 - Drawing Studio & A F2.16 - Architecture Studio',
-    ]
-    # Collect all special-case courses (already handled above)
-    special_courses = set([
-        'CS511.1', 'MBA535.1', 'CS509.1', 'VA502.1', 'VA517.1', 'VA519.1',
-        'ARCH100.1', 'ARCH108.1', 'ARCH201.1', 'ARCH108.2', 'ARCH202.1', 'ARCH303.2', 'ARCH308.1', 'ARCH106.1',
-        'ARCH211.1', 'ARCH303.1', 'ARCH403.1', 'ARCH405.1', 'ARCH412.1',
-        'ARCH202.3', 'ARCH304.2', 'ARCH414.1', 'ARCH201.2', 'ARCH110.1',
-        'ARCH208.1', 'ARCH208.2', 'ARCH216', 'ARCH360.1',
-        'ARCH210.1', 'ARCH311.1', 'ARCH358.1',
-        'ELIT103.1', 'ELIT103.2', 'VA312.1', 'VA312.2', 'VA451.1',
-        'IBF407.1', 'MAN328.1', 'MAN406.1',
-        'VA211.1', 'VA211.2', 'VA304.1', 'VA315.1', 'VA323.1', 'VA323.2', 'VA406.1', 'VA416.1', 'VA443.1', 'VA452.1', 'VA455.1',
-        'VA104.1', 'VA104.2', 'VA310.1', 'VA217.1', 'VA217.2', 'VA217.3', 'VA334.1',
-        'PSY519.1', 'PSY524.1', 'PSY529.1',
-        'BUS602.1', 'MBA581.1', 'ECON506.1', 'ECON601.1', 'ECON 601.1', 'ECON108.1', 'MATH201.1',
-    ])
-    for c in courses:
-        if c in special_courses:
-            continue
-        for r in specialized_classrooms:
-            for t in course_times.get(c, []):
-                if (c, r, t) in x:
-                    prob += x[c, r, t] == 0
-    # --- End block for regular courses ---
+    conflict_rows = room_conflict_rows(columns, index)
+    room_name = index['room_name']
+    conflict_limits = [len(room_classes[room_name[columns[cols[0]][1]]]) if room_classes else 1 for cols in conflict_rows]
+
+    # Model: PuLP expressions, unless the matrix back end takes the rows as they are
+    use_matrix = args.backend == 'matrix' and not args.decompose and matrix_solver_name() is not None
+    if args.backend == 'matrix' and not use_matrix:
+        print('Matrix back end needs scipy or highspy and no --decompose; building the PuLP model instead')
+    lazy = args.lazy_conflicts and not args.decompose
+    if args.lazy_conflicts and not lazy:
+        print('Lazy conflict rows do not combine with --decompose; building every conflict row')
+    prob = None
+    if not use_matrix:
+        prob = pulp.LpProblem('ClassroomAssignment', pulp.LpMinimize)
+        prob += pulp.lpSum([x[key] * cost for key, cost in costs.items()]) + fixed_cost
+        variables = list(x.values())
+        for cols in assignment_rows:
+            prob += pulp.lpSum([variables[j] for j in cols]) == 1
+        if not lazy:
+            for cols, limit in zip(conflict_rows, conflict_limits):
+                prob += pulp.lpSum([variables[j] for j in cols]) <= limit
+
+    return {
+        'fixed_assignment': fixed_assignment,
+        'status_rules': status_rules,
+        'x': x,
+        'costs': costs,
+        'fixed_cost': fixed_cost,
+        'prob': prob,
+        'candidates': candidates,
+        'index': index,
+        'columns': columns,
+        'assignment_rows': assignment_rows,
+        'conflict_rows': conflict_rows,
+        'conflict_limits': conflict_limits,
+        'room_classes': room_classes,
+        'lazy_rows': set() if lazy else None,
+    }
+
+# Warm start, heuristic and incremental set-up around the solve; returns (solve info, assignment)
+def solve_phase(data, model, args):
+    capacities = data['capacities']
+    course_table = data['course_table']
+    courses = data['courses']
+    course_times = data['course_times']
+    x = model['x']
+    costs = model['costs']
+    fixed_cost = model['fixed_cost']
+    candidates = model['candidates']
+    fixed_assignment = model['fixed_assignment']
+
+    # Warm start from a previous run's workbook
+    if args.warm_start_from:
+        previous = load_warm_start(args.warm_start_from)
+        if model['room_classes']:
+            room_class = {r: name for name, rooms in model['room_classes'].items() for r in rooms}
+            previous = {key: room_class.get(r, r) for key, r in previous.items()}
+        matched = apply_warm_start(x, previous)
+        print(f'Warm start: {matched} of {len(candidates)} course-times taken from {args.warm_start_from}')
+
+    # Greedy assignment, as the answer or as CBC's starting incumbent
+    heuristic = None
+    if args.heuristic or args.heuristic_start:
+        start = time.perf_counter()
+        heuristic = heuristic_assign(costs, course_table)
+        heuristic_time = time.perf_counter() - start
+        heuristic_cost = sum(costs[(c, r, t)] for (c, t), r in heuristic.items()) + fixed_cost
+        print(f'Heuristic: {len(heuristic)} of {len(candidates)} course-times placed, '
+              f'objective {heuristic_cost:g}, {heuristic_time * 1000:.1f} ms')
+        if args.heuristic_start and not args.heuristic:
+            apply_warm_start(x, heuristic)
+
+    # Incremental mode: only re-optimize what changed since the last snapshot
+    fixed = []
+    if args.incremental and not args.heuristic:  # the heuristic re-solves everything anyway
+        snapshot = load_snapshot(args.snapshot)
+        if snapshot is None:
+            print(f'Incremental: no snapshot at {args.snapshot}, solving the full model')
+        else:
+            changed = diff_snapshot(snapshot, courses, course_times, capacities, course_table)
+            fixed, freed = fix_unaffected(x, snapshot, changed)
+            print(f'Incremental: {len(changed)} changed courses, {len(freed)} course-times re-optimized, {len(fixed)} kept')
 
     # Solve
-    prob.solve()
+    if args.heuristic:
+        solve_info = use_heuristic_solution(model, heuristic, heuristic_time)
+    else:
+        solve_info = solve_assignment(model, args)
+    if fixed and solve_info['status'] != 'Optimal':
+        # The kept rooms leave no room for the changes; fall back to the full model
+        print(f"Incremental solve ended {solve_info['status']}; re-solving the full model")
+        for var in fixed:
+            var.lowBound = 0
+        solve_info = solve_assignment(model, args)
+    print(format_solve_info(solve_info))
+    if args.heuristic or has_solution(solve_info):
+        assignment = extract_assignment(x, fixed_assignment, model['room_classes'])
+    else:
+        print('No solution to read back; every course-time outside the pins is left unassigned')
+        assignment = dict(fixed_assignment)
+    if solve_info['status'] == 'Optimal':
+        save_snapshot(args.snapshot, courses, course_times, capacities, course_table, assignment)
+    return solve_info, assignment
+
+# Seat-hours total, unassigned and infeasible course-times
+def print_reports(data, assignment):
+    capacities = data['capacities']
+    courses = data['courses']
+    rooms = data['rooms']
+    course_times = data['course_times']
+    course_table = data['course_table']
+    course_id = course_table['id']
+    enrollments = course_table['enrollment']
 
     # Output results
-    assigned_courses = 0
-    total_unused_seat_hours = 0
-    for c in courses:
-        for t in course_times[c]:
-            assigned = False
-            for r in rooms:
-                if pulp.value(x[c, r, t]) == 1:
-                    unused = capacities[r] - get_enrollment(c)
-                    if unused < 0:
-                        unused = 0
-                    duration = parse_duration(t)
-                    total_unused_seat_hours += unused * duration
-                    assigned = True
-            if assigned:
-                assigned_courses += 1
-
+    course_time_list = [(c, t) for c in courses for t in course_times[c]]
+    total_unused_seat_hours = unused_seat_hours(course_time_list, assignment, capacities, course_table)
     print(f"Total unused seat-hours: {total_unused_seat_hours}")
 
     # List all unassigned course-times
     print('\n--- Unassigned Course-Times (not assigned to any room or enrollment=0) ---')
-    for c in courses:
-        for t in course_times[c]:
-            assigned = any(pulp.value(x[c, r, t]) == 1 for r in rooms)
-            enrollment = get_enrollment(c)
-            if not assigned:
-                print(f'Course {c} at {t} (enrollment: {enrollment})')
+    for c, t in course_time_list:
+        if (c, t) not in assignment:
+            print(f'Course {c} at {t} (enrollment: {enrollments[course_id[c]]})')
     print('Course TURK112.4 (enrollment: 0)')
     print('Course ELIT100.6 (enrollment: 0)')
 
@@ -1071,15 +1787,23 @@ def main():
     for c in courses:
         for t in course_times[c]:
             if c == 'MATH201.1':
-                print(f'Course MATH201.1 at {t} (enrollment: {get_enrollment("MATH201.1")})')
-            elif all(get_enrollment(c) > capacities[r] for r in rooms):
-                print(f'Course {c} at {t} (enrollment: {get_enrollment(c)})')
-
-    # Output results to Excel (one row per course, with up to two times)
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Assignments'
-    ws.append(['Course Code', 'Assigned Room 1', 'Time 1', 'Assigned Room 2', 'Time 2', 'Enrollment', 'Room Capacity 1', 'Room Capacity 2', 'Assignment Status'])
+                print(f'Course MATH201.1 at {t} (enrollment: {enrollments[course_id["MATH201.1"]]})')
+            elif all(enrollments[course_id[c]] > capacities[r] for r in rooms):
+                print(f'Course {c} at {t} (enrollment: {enrollments[course_id[c]]})')
+
+# Workbook rows, one per course with up to two times; returns (rows, courses assigned)
+def build_output_rows(data, model, assignment):
+    capacities = data['capacities']
+    preassigned = data['preassigned']
+    courses = data['courses']
+    rooms = data['rooms']
+    course_times = data['course_times']
+    course_id = data['course_table']['id']
+    enrollments = data['course_table']['enrollment']
+    status_rules = model['status_rules']
+
+    # Output rows (one per course, with up to two times), checked before they are written
+    rows = []
 
     # --- Output preassigned special lab courses in Excel ---
     for p in preassigned:
@@ -1087,12 +1811,12 @@ def main():
         if p['course_code'] == 'ENS207' and not p['room']:
             continue
         if p['room']:
-            enrollment = get_enrollment(p['course_code'])
+            enrollment = enrollments[course_id[p['course_code']]] if p['course_code'] in course_id else None
             cap = capacities.get(p['room'], '')
-            ws.append([p['course_code'], p['room'], p['time'], '', '', enrollment, cap, '', 'Assigned (Special Lab)'])
+            rows.append([p['course_code'], p['room'], p['time'], '', '', enrollment, cap, '', 'Assigned (Special Lab)'])
         else:
-            enrollment = get_enrollment(p['course_code'])
-            ws.append([p['course_code'], '', p['time'], '', '', enrollment, '', '', 'Unassigned (No Lab Available)'])
+            enrollment = enrollments[course_id[p['course_code']]] if p['course_code'] in course_id else None
+            rows.append([p['course_code'], '', p['time'], '', '', enrollment, '', '', 'Unassigned (No Lab Available)'])
     # --- End output for preassigned ---
 
     # Mapping for two-day courses and their times
@@ -1110,14 +1834,8 @@ def main():
 
     assigned_courses = 0
     excel_rows_written = 0
-    multimedia_courses_set = set(['ELIT103.1', 'ELIT103.2', 'VA312.1', 'VA312.2', 'VA451.1'])
-    force_multimedia_courses = set(['VA312.1', 'VA312.2'])
-    fba_courses_set = set(['IBF407.1', 'MAN328.1', 'MAN406.1'])
-    fba_room = 'B F1.1 FBA Graduate Seminar Room'
-    mac_grad_courses_set = set(['VA502.1', 'VA517.1', 'VA519.1'])
-    big_arch_courses_set = set(['ARCH100.1', 'ARCH108.1', 'ARCH201.1'])
     for c in courses:
-        enrollment = get_enrollment(c)
+        enrollment = enrollments[course_id[c]]
         # If course is a two-day course, use the provided times
         if c in two_day_courses:
             t1, t2 = two_day_courses[c]
@@ -1134,294 +1852,155 @@ def main():
         if enrollment == 0:
             status = 'Unassigned (enrollment=0)'
         else:
-            for r in rooms:
-                if t1 and t1 in course_times[c]:
-                    if pulp.value(x[c, r, t1]) == 1:
-                        assigned_room1 = r
-                        cap1 = capacities[r]
-                if t2 and t2 in course_times[c]:
-                    if pulp.value(x[c, r, t2]) == 1:
-                        assigned_room2 = r
-                        cap2 = capacities[r]
-            # --- Only override status for CS511.1 and MBA535.1 if assigned to a computer lab ---
-            if c in cs_mba_lab_courses:
-                assigned_to_lab = (assigned_room1 in computer_lab_rooms) or (assigned_room2 in computer_lab_rooms)
-                if assigned_to_lab:
-                    status = 'Assigned (Special Lab)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for CS509.1 ---
-            elif c == 'CS509.1':
-                cs509_room = 'A F1.4 - Class/Laboratory'
-                assigned_to_cs509_room = (assigned_room1 == cs509_room) or (assigned_room2 == cs509_room)
-                if assigned_to_cs509_room:
-                    status = 'Assigned (Class/Laboratory)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for ECON108.1
-            if c == 'ECON108.1':
-                assigned_to_econ_lab = (assigned_room1 == econ_room) or (assigned_room2 == econ_room)
-                if assigned_to_econ_lab:
-                    status = 'Assigned (ECON Lab)'
-            # --- Assignment status for MATH201.1 ---
-            elif c == 'MATH201.1':
-                math201_room = 'B F1.23 - Amphitheater I'
-                assigned_to_math201_room = (assigned_room1 == math201_room) or (assigned_room2 == math201_room)
-                if assigned_to_math201_room:
-                    status = 'Assigned (Special Case due to Capacity)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for MAC Studio graduate courses ---
-            elif c in mac_grad_courses_set:
-                assigned_to_mac = (assigned_room1 == mac_room) or (assigned_room2 == mac_room)
-                if assigned_to_mac:
-                    status = 'Assigned (MAC Studio)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for Big Architecture Studio courses ---
-            elif c in big_arch_courses_set:
-                assigned_to_big_arch = (assigned_room1 == big_arch_room) or (assigned_room2 == big_arch_room)
-                if assigned_to_big_arch:
-                    status = 'Assigned (Big Architecture Studio)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for ARCH109.1 and ARCH109.2 ---
-            # (Removed: handled by specific room blocks below)
-            # --- Assignment status for Small Architecture Studio courses ---
-            elif c in ['ARCH108.2', 'ARCH202.1', 'ARCH303.2', 'ARCH308.1', 'ARCH106.1']:
-                assigned_to_small_arch = (assigned_room1 == small_arch_room) or (assigned_room2 == small_arch_room)
-                if assigned_to_small_arch:
-                    status = 'Assigned (Small Architecture Studio)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for A F2.8 - Drawing Studio courses ---
-            elif c in ['ARCH202.3', 'ARCH304.2', 'ARCH414.1', 'ARCH109.1']:
-                assigned_to_f2_8 = (assigned_room1 == f2_8_room) or (assigned_room2 == f2_8_room)
-                if assigned_to_f2_8:
-                    status = 'Assigned (A F2.8 - Drawing Studio)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for A B.8 - Fabrication Lab courses ---
-            elif c in ['ARCH201.2']:
-                assigned_to_fab_lab = (assigned_room1 == fabrication_lab_room) or (assigned_room2 == fabrication_lab_room)
-                if assigned_to_fab_lab:
-                    status = 'Assigned (A B.8 - Fabrication Lab)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for A B.16 - VACD Drawing Studio courses ---
-            elif c in ['ARCH110.1']:
-                assigned_to_vacd_drawing = (assigned_room1 == vacd_drawing_room) or (assigned_room2 == vacd_drawing_room)
-                if assigned_to_vacd_drawing:
-                    status = 'Assigned (A B.16 - VACD Drawing Studio)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for A F1.3 - Computer Lab special lab courses ---
-            elif c in ['ARCH208.1', 'ARCH208.2', 'ARCH216', 'ARCH360.1']:
-                assigned_to_af13_lab = (assigned_room1 == af13_lab_room) or (assigned_room2 == af13_lab_room)
-                if assigned_to_af13_lab:
-                    status = 'Assigned (Special Lab)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for combined architecture studio courses ---
-            elif c in ['ARCH210.1', 'ARCH311.1', 'ARCH358.1']:
-                assigned_to_combined = (assigned_room1 == combined_studio_room) or (assigned_room2 == combined_studio_room)
-                if assigned_to_combined:
-                    status = 'Assigned (Two Architecture Studios Used)'
-                else:
-                    infeasible = all(enrollment > capacities[r] for r in rooms)
-                    status = 'Infeasible' if infeasible else 'Unassigned'
-            # --- Assignment status for A F2.16 - Architecture Studio courses ---
-            elif c in ['ARCH211.1', 'ARCH303.1', 'ARCH403.1', 'ARCH405.1', 'ARCH412.1']:
-                assigned_to_f2_16 = (assigned_room1 == f2_16_room) or (assigned_room2 == f2_16_room)
-                if assigned_to_f2_16:
-                    status = 'Assigned (A F2.16 Architecture Studio)'
+            if t1:
+                assigned_room1 = assignment.get((c, t1))
+                cap1 = capacities[assigned_room1] if assigned_room1 else ''
+            if t2:
+                assigned_room2 = assignment.get((c, t2))
+                cap2 = capacities[assigned_room2] if assigned_room2 else ''
+            # Courses with a room rule report whether they got the rule's room
+            rule_status = status_rules.get(c)
+            if rule_status is not None:
+                label, label_rooms = rule_status
+                if assigned_room1 in label_rooms or assigned_room2 in label_rooms:
+                    status = f'Assigned ({label})'
+                elif assigned_room1 or assigned_room2:
+                    status = f'Assigned (Not {label} due to capacity)'
                 else:
                     infeasible = all(enrollment > capacities[r] for r in rooms)
                     status = 'Infeasible' if infeasible else 'Unassigned'
+            elif (t1 and assigned_room1) or (t2 and assigned_room2):
+                status = 'Assigned'
             else:
-                # Special status for ECON Lab forced courses
-                econ_lab_courses = set(['BUS602.1', 'MBA581.1', 'ECON506.1', 'ECON601.1', 'ECON 601.1'])
-                econ_lab_room = 'B F1.2 - Class/ECON Lab'
-                if c in econ_lab_courses:
-                    assigned_to_econ_lab = (assigned_room1 == econ_room) or (assigned_room2 == econ_room)
-                    if assigned_to_econ_lab:
-                        status = 'Assigned (ECON Lab)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not ECON Lab)'
-                       
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for multimedia studio courses
-                elif c in multimedia_courses_set:
-                    assigned_to_vacd = (assigned_room1 == multimedia_room) or (assigned_room2 == multimedia_room)
-                    if assigned_to_vacd:
-                        status = 'Assigned (VACD Multimedia Studio)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not VACD Multimedia Studio due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                    if c in force_multimedia_courses:
-                        status = 'Assigned (VACD Multimedia Studio)'
-                # Special status for MAC Studio courses
-                elif c in mac_courses_set:
-                    assigned_to_mac = (assigned_room1 == mac_room) or (assigned_room2 == mac_room)
-                    if assigned_to_mac:
-                        status = 'Assigned (MAC Studio)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not MAC Studio due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for FBA Graduate Seminar Room courses
-
-                elif c in fba_courses_set:
-                    assigned_to_fba = (assigned_room1 == fba_room) or (assigned_room2 == fba_room)
-                    if assigned_to_fba:
-                        status = 'Assigned (FBA Graduate Seminar Room)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not FBA Graduate Seminar Room due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for Drawing Studio courses
-                elif c in drawing_courses_set:
-                    drawing_room = 'A B.16 - VACD Drawing Studio'
-                    assigned_to_drawing = (assigned_room1 == drawing_room) or (assigned_room2 == drawing_room)
-                    if assigned_to_drawing:
-                        status = 'Assigned (VACD Drawing Studio)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not VACD Drawing Studio due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for B F1.10 Class/ART Studio courses
-                elif c in b_f1_10_courses_set:
-                    b_f1_10_room = 'B F1.10 Class/ART Studio'
-                    assigned_to_b_f1_10 = (assigned_room1 == b_f1_10_room) or (assigned_room2 == b_f1_10_room)
-                    if assigned_to_b_f1_10:
-                        status = 'Assigned (B F1.10 Class/ART Studio)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not B F1.10 Class/ART Studio due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for A F3.10 - Architecture Classroom courses
-                elif c in a_f3_10_courses_set:
-                    a_f3_10_room = 'A F3.10 - Architecture Classroom'
-                    assigned_to_a_f3_10 = (assigned_room1 == a_f3_10_room) or (assigned_room2 == a_f3_10_room)
-                    if assigned_to_a_f3_10:
-                        status = 'Assigned (A F3.10 - Architecture Classroom)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not A F3.10 - Architecture Classroom due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                # Special status for A B.13 - Class/PSY Lab courses
-                elif c in a_b_13_courses_set:
-                    a_b_13_room = 'A B.13 - Class/PSY Lab'
-                    assigned_to_a_b_13 = (assigned_room1 == a_b_13_room) or (assigned_room2 == a_b_13_room)
-                    if assigned_to_a_b_13:
-                        status = 'Assigned (A B.13 - Class/PSY Lab)'
-                    else:
-                        if (assigned_room1 or assigned_room2):
-                            status = 'Assigned (Not A B.13 - Class/PSY Lab due to capacity)'
-                        else:
-                            infeasible = all(enrollment > capacities[r] for r in rooms)
-                            status = 'Infeasible' if infeasible else 'Unassigned'
-                else:
-                    if (t1 and assigned_room1) or (t2 and assigned_room2):
-                        status = 'Assigned'
-                    else:
-                        infeasible = all(enrollment > capacities[r] for r in rooms)
-                        status = 'Infeasible' if infeasible else 'Unassigned'
+                infeasible = all(enrollment > capacities[r] for r in rooms)
+                status = 'Infeasible' if infeasible else 'Unassigned'
         # Skip unassigned or infeasible ENS207 rows
         if c == 'ENS207' and status != 'Assigned':
             continue
         if status.startswith('Assigned'):
             assigned_courses += 1
-        ws.append([c, assigned_room1 or '', t1, assigned_room2 or '', t2, enrollment, cap1, cap2, status])
+        rows.append([c, assigned_room1 or '', t1, assigned_room2 or '', t2, enrollment, cap1, cap2, status])
         excel_rows_written += 1
-    wb.save('course_assignments.xlsx')
-    print(f"\nResults saved to course_assignments.xlsx. Total assigned courses: {assigned_courses} out of {len(courses)}")
-
-    # --- Post-processing: Verify constraints in Excel output ---
-    print('\n--- Verifying Excel output constraints ---')
-    excel_wb = openpyxl.load_workbook('course_assignments.xlsx')
-    excel_ws = excel_wb.active
-    room_time = defaultdict(list)  # (room, time) -> [course_code]
-    course_room_time = defaultdict(list)  # (course_code, time) -> [room]
-    for row in excel_ws.iter_rows(min_row=2, values_only=True):
-        code, room1, time1, room2, time2, enrollment, cap1, cap2, status = row
-        if status == 'Assigned':
-            if room1 and time1:
-                room_time[(room1, time1)].append(code)
-                course_room_time[(code, time1)].append(room1)
-            if room2 and time2:
-                room_time[(room2, time2)].append(code)
-                course_room_time[(code, time2)].append(room2)
-    # 1. No overlapping courses in the same room at the same time
-    overlap_found = False
-    for (room, time), codes in room_time.items():
-        if len(codes) > 1:
-            print(f'Overlap: Room {room} at {time} assigned to multiple courses: {codes}')
-            overlap_found = True
-    # 2. Each course-time assigned to exactly one classroom
-    multiroom_found = False
-    for (code, time), rooms in course_room_time.items():
-        if len(rooms) > 1:
-            print(f'Course {code} at {time} assigned to multiple rooms: {rooms}')
-            multiroom_found = True
-    if not overlap_found and not multiroom_found:
+    return rows, assigned_courses
+
+# Verify constraints on the output rows before they are written
+def print_verification(rows):
+    print('\n--- Verifying output constraints ---')
+    problems = verify_assignment_rows(rows)
+    for problem in problems:
+        print(problem)
+    if not problems:
         print('All constraints satisfied in Excel output.')
     print("\n- No overlapping courses in the same room at the same time")
     print("- Each course-time is assigned exactly one classroom")
     print("- Each course is assigned during its scheduled time (by construction)")
-
-    # --- Add second meeting times for courses with two days ---
-   
-    # Format: course_code: [first_time, second_time]
-    two_day_courses = {
-        'ELT370.1': ['Wed. 12:00-13:50', 'Thu. 09:00-09:50'],
-        'ELT371.1': ['Wed. 12:00-13:50', 'Thu. 09:00-09:50'],
-        'ELT471.1': ['Wed. 12:00-13:50', 'Thu. 09:00-09:50'],
-        'ELT571.1': ['Wed. 12:00-13:50', 'Thu. 09:00-09:50'],
-        'MATH101.2': ['Wed. 16:00-16:50', 'Thu. 13:00-14:50'],
-        'MATH102.1': ['Mon. 09:00-09:50', 'Tue. 12:00-13:50'],
-        'MATH201.1': ['Mon. 14:00-14:50', 'Wed. 09:00-10:50'],
-        'MATH201.2': ['Mon. 10:00-10:50', 'Wed. 12:00-13:50'],
-        'ELT599.1': ['Mon. 17:00-17:50', 'Tue. 17:00-18:50'],
+    return problems
+
+# 16. Run instrumentation
+# main() runs each phase through a recorder that notes its wall time, how much the phase raised the
+# process's peak RSS, the process's peak so far (which also covers earlier jobs in a batch worker)
+# and any counts the phase reports (courses, variables, constraints). --profile-phases also dumps a
+# cProfile per phase (<workbook name>.<phase>.prof) and --trace-memory records the peak Python
+# allocation seen by tracemalloc within the phase. The records go to a JSON run report next to the
+# workbook.
+RUN_REPORT_JSON = 'course_assignments.run.json'
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+# Rows in the model; with --lazy-conflicts only the conflict rows added so far
+def model_constraints(model):
+    conflicts = model['conflict_rows'] if model['lazy_rows'] is None else model['lazy_rows']
+    return len(model['assignment_rows']) + len(conflicts)
+
+def model_counts(model):
+    counts = {
+        'variables': len(model['x']),
+        'constraints': model_constraints(model),
+        'course_times': len(model['candidates']),
+    }
+    if model['lazy_rows'] is not None:
+        counts['conflict_rows_available'] = len(model['conflict_rows'])
+    return counts
+
+# Returns run_phase(name, func, *args, counts=None) and the list of records it fills
+def make_phase_recorder(args):
+    phases = []
+
+    def run_phase(name, func, *func_args, counts=None):
+        record = {'phase': name}
+        profiler = cProfile.Profile() if args.profile_phases else None
+        if args.trace_memory:
+            tracemalloc.start()
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*func_args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_time'] = round(time.perf_counter() - start, 4)
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            if rss_before is not None:
+                record['peak_rss_growth_mb'] = round(record['process_peak_rss_mb'] - rss_before, 1)
+            if args.trace_memory:
+                record['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+                tracemalloc.stop()
+            if profiler is not None:
+                record['profile'] = f'{os.path.splitext(args.output)[0]}.{name}.prof'
+                profiler.dump_stats(record['profile'])
+            phases.append(record)
+        if counts is not None:
+            record.update(counts(result))
+        return result
+
+    return run_phase, phases
+
+def write_run_report(path, argv, phases, solve_info):
+    report = {
+        'argv': list(argv),
+        'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'total_wall_time': round(sum(p['wall_time'] for p in phases), 4),
+        'process_peak_rss_mb': peak_rss_mb(),
+        'phases': phases,
+        'solve': solve_info,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def main(argv=None):
+    args = parse_args(argv)
+    run_phase, phases = make_phase_recorder(args)
+
+    inputs = run_phase('load_inputs', load_inputs, args)
+    data = run_phase('prepare_data', prepare_data, inputs,
+                     counts=lambda data: {'courses': len(data['courses']), 'rooms': len(data['rooms'])})
+    model = run_phase('build_model', build_model, data, args, counts=model_counts)
+    solve_info, assignment = run_phase('solve', solve_phase, data, model, args,
+                                       counts=lambda _: {'constraints': model_constraints(model)})
+    run_phase('reports', print_reports, data, assignment)
+    rows, assigned_courses = run_phase('output_rows', build_output_rows, data, model, assignment)
+    run_phase('verify', print_verification, rows)
+    run_phase('write_workbook', write_assignments_workbook, args.output, rows, solve_info)
+    print(f"\nResults saved to {args.output}. Total assigned courses: {assigned_courses} out of {len(data['courses'])}")
+    if args.parquet_dir:
+        run_phase('write_parquet', write_parquet_tables, args.parquet_dir, inputs, rows, solve_info)
+    write_run_report(args.run_report, sys.argv[1:] if argv is None else argv, phases, solve_info)
+    print(f'Run report saved to {args.run_report}')
+
+    return {
+        'workbook': args.output,
+        'run_report': args.run_report,
+        'courses': len(data['courses']),
+        'assigned_courses': assigned_courses,
+        'solve': solve_info,
     }
-    # For each course, if present in schedule, ensure both times are present as separate entries
-    new_entries = []
-    for code, times in two_day_courses.items():
-        # Only add if course is in enrollments and at least one time is already in schedule
-        if code in enrollments_raw:
-            times_in_sched = [s for s in schedule if s['course_code'] == code]
-            existing_times = set(s['time'] for s in times_in_sched)
-            for t in times:
-                if t not in existing_times:
-                    # Add a new entry for this time, room left blank for assignment
-                    new_entries.append({'course_code': code, 'time': t, 'room': ''})
-    schedule.extend(new_entries)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import main as pipeline
+
+# What-if server: loads the inputs once, keeps the built model and the last solution in memory
+# and re-solves after every change, warm-started from the previous answer.
+#
+#   python whatif_server.py [--host 127.0.0.1] [--port 8765] [main.py options]
+#
+#   GET  /assignment                                        current rooms and the last solve
+#   POST /enrollment  {"course": "ARCH216", "enrollment": 60}
+#   POST /capacity    {"room": "B F1.23 - Amphitheater I", "capacity": 120}
+#   POST /close       {"room": "B F1.23 - Amphitheater I", "day": "Tue"}
+#   POST /reopen      {"room": "B F1.23 - Amphitheater I", "day": "Tue"}
+#   POST /reset                                             drop every change
+#
+# Closing or reopening a room only changes variable bounds on the resident model; enrollment and
+# capacity changes rebuild the model from the in-memory inputs (the DOCX files are not re-read).
+# Rooms pinned by room_rules.csv are settled before the model and are not affected by closures.
+# Requests are handled one at a time, so a solve never sees a half-applied change.
+DEFAULT_PORT = 8765
+
+class WhatIfSession:
+    def __init__(self, args):
+        # CBC reads the previous answer as its MIP start on every re-solve; closures act on single rooms, not classes
+        self.args = argparse.Namespace(**{**vars(args), 'warm_start': True, 'incremental': False, 'room_classes': False})
+        self.inputs = pipeline.load_inputs(args)
+        self.reset()
+
+    def reset(self):
+        self.enrollments = {}
+        self.capacities = {}
+        self.closed = set()  # (room, day)
+        self.assignment = {}
+        self.rebuild()
+        return self.solve()
+
+    def rebuild(self):
+        inputs = dict(self.inputs, capacities={**self.inputs['capacities'], **self.capacities})
+        self.data = pipeline.prepare_data(inputs, self.enrollments)
+        self.model = pipeline.build_model(self.data, self.args)
+        for room, day in self.closed:
+            self.set_room_bounds(room, day, 0)
+
+    def set_room_bounds(self, room, day, up):
+        for (c, r, t), var in self.model['x'].items():
+            slot = pipeline.parse_time_slot(t)
+            if r == room and slot is not None and slot.day == day:
+                var.upBound = up
+
+    def solve(self):
+        x = self.model['x']
+        # Course-times whose previous room was just closed start from scratch
+        start = {(c, t): r for (c, t), r in self.assignment.items() if (c, r, t) in x and x[c, r, t].upBound != 0}
+        pipeline.apply_warm_start(x, start)
+        self.solve_info = pipeline.solve_assignment(self.model, self.args)
+        previous = self.assignment
+        if pipeline.has_solution(self.solve_info):
+            self.assignment = pipeline.extract_assignment(x, self.model['fixed_assignment'])
+        else:
+            # The old answer may sit in a room closed since; only the pins keep their rooms
+            self.assignment = dict(self.model['fixed_assignment'])
+        moved = [
+            {'course': c, 'time': t, 'from': previous.get((c, t)), 'to': self.assignment.get((c, t))}
+            for c, t in sorted(set(previous) | set(self.assignment))
+            if previous and previous.get((c, t)) != self.assignment.get((c, t))
+        ]
+        return {'solve': self.solve_info, 'moved': moved, 'pinned_in_closed_rooms': self.pinned_in_closed_rooms()}
+
+    # Pinned and preassigned course-times are settled before the model, so closing their room
+    # does not move them; they are listed for the caller instead
+    def pinned_in_closed_rooms(self):
+        held = []
+        for (c, t), r in sorted(self.model['fixed_assignment'].items()):
+            slot = pipeline.parse_time_slot(t)
+            if slot is not None and (r, slot.day) in self.closed:
+                held.append({'course': c, 'time': t, 'room': r})
+        return held
+
+    def set_enrollment(self, course, enrollment):
+        if course not in self.data['course_table']['id']:
+            raise ValueError(f'unknown course {course!r}')
+        # Store the override under the code the course table resolved (sections share their base code)
+        key = course if course in self.data['enrollments_raw'] else course.split('.')[0]
+        self.enrollments[key] = int(enrollment)
+        self.rebuild()
+        return self.solve()
+
+    def set_capacity(self, room, capacity):
+        if room not in self.inputs['capacities']:
+            raise ValueError(f'unknown room {room!r}')
+        self.capacities[room] = int(capacity)
+        self.rebuild()
+        return self.solve()
+
+    def close_room(self, room, day, closed=True):
+        if room not in self.inputs['capacities']:
+            raise ValueError(f'unknown room {room!r}')
+        day = day.strip()[:3].title()
+        if closed:
+            self.closed.add((room, day))
+        else:
+            self.closed.discard((room, day))
+        self.set_room_bounds(room, day, 0 if closed else 1)
+        return self.solve()
+
+    def report(self):
+        course_id = self.data['course_table']['id']
+        enrollments = self.data['course_table']['enrollment']
+        capacities = self.data['capacities']
+        # Every scheduled course-time, including those no room can take (they have no candidates)
+        course_times = self.data['course_times']
+        unassigned = [
+            {'course': c, 'time': t}
+            for c, t in sorted(set((c, t) for c in self.data['courses'] for t in course_times[c]))
+            if (c, t) not in self.assignment
+        ]
+        return {
+            'solve': self.solve_info,
+            'closed': [{'room': r, 'day': d} for r, d in sorted(self.closed)],
+            'pinned_in_closed_rooms': self.pinned_in_closed_rooms(),
+            'enrollments': self.enrollments,
+            'capacities': self.capacities,
+            'assignment': [
+                {'course': c, 'time': t, 'room': r, 'enrollment': enrollments[course_id[c]], 'capacity': capacities[r]}
+                for (c, t), r in sorted(self.assignment.items())
+            ],
+            'unassigned': unassigned,
+        }
+
+# Request fields, checked before they reach the session; a bad type or a negative count is a 400
+# like a missing field
+def str_field(body, name):
+    value = body[name]
+    if not isinstance(value, str):
+        raise ValueError(f'{name} must be a string, got {value!r}')
+    return value
+
+def int_field(body, name):
+    value = body[name]
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f'{name} must be an integer, got {value!r}')
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer, got {value!r}')
+    if number < 0:
+        raise ValueError(f'{name} must not be negative, got {number}')
+    return number
+
+def make_handler(session):
+    class WhatIfHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/assignment':
+                self.send_json(200, session.report())
+            else:
+                self.send_json(404, {'error': f'no such endpoint {self.path}'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(body, dict):
+                    raise ValueError('request body must be a JSON object')
+                if self.path == '/enrollment':
+                    result = session.set_enrollment(str_field(body, 'course'), int_field(body, 'enrollment'))
+                elif self.path == '/capacity':
+                    result = session.set_capacity(str_field(body, 'room'), int_field(body, 'capacity'))
+                elif self.path == '/close':
+                    result = session.close_room(str_field(body, 'room'), str_field(body, 'day'))
+                elif self.path == '/reopen':
+                    result = session.close_room(str_field(body, 'room'), str_field(body, 'day'), closed=False)
+                elif self.path == '/reset':
+                    result = session.reset()
+                else:
+                    self.send_json(404, {'error': f'no such endpoint {self.path}'})
+                    return
+            except KeyError as e:
+                self.send_json(400, {'error': f'missing field {e}'})
+                return
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            self.send_json(200, result)
+
+    return WhatIfHandler
+
+def serve(argv=None):
+    parser = argparse.ArgumentParser(description='Keep the classroom model in memory and answer what-if changes.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    server_args, rest = parser.parse_known_args(argv)
+    session = WhatIfSession(pipeline.parse_args(rest))
+    print(pipeline.format_solve_info(session.solve_info))
+    server = HTTPServer((server_args.host, server_args.port), make_handler(session))
+    print(f'What-if server listening on http://{server_args.host}:{server_args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    serve()